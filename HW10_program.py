@@ -1,20 +1,20 @@
 import matplotlib.pyplot as plt
 import control as ct
-import numpy as np
-from scipy.signal import residue
 
+from poles import batch_zpk, zpk_systems
+from time_grid import time_grid
+
+
+# Poles of all three Problem 1 plants in one call instead of one residue() per plant
+P1_zeros, P1_poles, P1_gains = batch_zpk([[26], [104], [41]],
+                                         [[1, 3, 28, 26], [1, 6, 34, 104], [1, 9, 49, 41]])
+GA_zpk, GB_zpk, GC_zpk = zpk_systems(P1_zeros, P1_poles, P1_gains)
 
 # PART 1A =========================================
 print("Problemm 1A:")
-[R, P, K] = residue([26], [1, 3, 28, 26])
-print (P)
+print (P1_poles[0])
 #Tells me the roots of the denominator
 
-A_roots = []
-A_poles = [-1, -1+5j, -1-5j]
-A_gain = [26]
-
-GA_zpk = ct.zpk(A_roots, A_poles, A_gain)
 print(f"GS of probelm 1A transfer function is: {GA_zpk}")
 plt.figure(1)
 ct.pzmap(GA_zpk)
@@ -23,15 +23,9 @@ plt.show()
 
 # PART 1B =========================================
 print("Problemm 1B:")
-[R, P, K] = residue([104], [1, 6, 34, 104])
-print (P)
+print (P1_poles[1])
 #Tells me the roots of the denominator
 
-B_roots = []
-B_poles = [-4, -1+5j, -1-5j]
-B_gain = [104]
-
-GB_zpk = ct.zpk(B_roots, B_poles, B_gain)
 print(f"GS of probelm 1B transfer function is: {GB_zpk}")
 plt.figure(2)
 ct.pzmap(GB_zpk)
@@ -40,15 +34,9 @@ plt.show()
 
 # PART 1C =========================================
 print("Problemm 1C:")
-[R, P, K] = residue([41], [1, 9, 49, 41])
-print (P)
+print (P1_poles[2])
 #Tells me the roots of the denominator
 
-C_roots = []
-C_poles = [-1, -4+5j, -4-5j]
-C_gain = [41]
-
-GC_zpk = ct.zpk(C_roots, C_poles, C_gain)
 print(f"GS of probelm 1B transfer function is: {GC_zpk}")
 plt.figure(3)
 ct.pzmap(GC_zpk)
@@ -60,7 +48,7 @@ gsa_tf = ct.TransferFunction([26], [1, 3, 28, 26])
 gsb_tf = ct.TransferFunction([104], [1, 6, 34, 104])
 gsc_tf = ct.TransferFunction([41], [1, 9, 49, 41])
 plt.figure(4)
-t = np.linspace(0, 10, 1000)  
+t = time_grid(P1_poles)  # long and fine enough for all three plants
 t1, y1 = ct.step_response(gsa_tf, t)
 t2, y2 = ct.step_response(gsb_tf, t)
 t3, y3 = ct.step_response(gsc_tf, t)
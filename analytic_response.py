@@ -0,0 +1,206 @@
+import numpy as np
+
+# Closed form time responses of first and second order transfer functions.
+# Everything broadcasts over a stack of systems, so one call replaces a loop of
+# ct.forced_response / ct.step_response calls.
+
+INPUT_TYPES = ('step', 'ramp', 'impulse')
+
+
+def _split_proper(num: np.ndarray, den: np.ndarray):
+    """Normalize a (N, 3) stack to monic form and split off the direct feedthrough.
+
+    Returns (first, d, b1, b0, a1, a0, valid) so that for second order rows
+    G(s) = d + (b1 s + b0)/(s^2 + a1 s + a0) and for first order rows
+    G(s) = d + b0/(s + a0).
+    """
+    first = den[:, 0] == 0
+    lead = np.where(first, den[:, 1], den[:, 0])
+    valid = np.isfinite(den).all(axis=1) & np.isfinite(num).all(axis=1) & (lead != 0)
+    # A first order row cannot have an s^2 numerator term (improper system)
+    valid &= ~first | (num[:, 0] == 0)
+    lead = np.where(valid, lead, 1.0)
+
+    d = np.where(first, num[:, 1], num[:, 0]) / lead
+    r1 = np.where(first, 0.0, num[:, 1] - d * den[:, 1])
+    r0 = num[:, 2] - d * den[:, 2]
+    b1 = r1 / lead
+    b0 = r0 / lead
+    a1 = np.where(first, 0.0, den[:, 1] / lead)
+    a0 = den[:, 2] / lead
+    # Step/ramp formulas divide by the DC term of the denominator
+    valid &= a0 != 0
+    return first, d, b1, b0, a1, a0, valid
+
+
+def _damped_basis(a1: np.ndarray, a0: np.ndarray, t: np.ndarray):
+    """Return e^(-σt), c(t) and s(t) for s^2 + a1 s + a0, with σ = a1/2.
+
+    c(t) and s(t) are cos(βt), sin(βt)/β for complex poles, cosh(γt), sinh(γt)/γ
+    for real poles and 1, t at the repeated root, so one set of formulas covers
+    every damping regime.
+    """
+    sigma = a1 / 2
+    beta2 = a0 - sigma**2
+    with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+        beta = np.sqrt(np.abs(beta2))
+        bt = beta * t
+        under = beta2 > 0
+        over = beta2 < 0
+        c = np.where(under, np.cos(bt), np.where(over, np.cosh(bt), 1.0))
+        safe = np.where(beta == 0, 1.0, beta)
+        s = np.where(under, np.sin(bt) / safe, np.where(over, np.sinh(bt) / safe, t))
+        decay = np.exp(-sigma * t)
+    return decay, c, s
+
+
+def analytic_response(numerator, denominator, t, input_type: str = 'step', amplitude=1.0) -> np.ndarray:
+    """
+    Evaluate the closed form response of G(s) = num/den to a step, ramp or impulse input.
+
+    Args:
+        numerator (array-like): Numerator coefficients in descending order of s, either one
+            system (m,) or a stack (N, m) with m <= 3.
+        denominator (array-like): Denominator coefficients in descending order of s, either
+            (2,)/(3,) for one system or a stack (N, 2)/(N, 3). In a (N, 3) stack a row with a
+            leading zero, e.g. [0, 1, 2], is treated as first order.
+        t (array-like): Time points, shape (T,).
+        input_type (str): 'step', 'ramp' or 'impulse'.
+        amplitude (float or array-like): Input amplitude, scalar or one per system.
+
+    Returns:
+        np.ndarray: Response of shape (T,) for one system or (N, T) for a stack. Rows that
+            are improper or have a zero constant denominator term are NaN. For biproper
+            systems the impulse response omits the Dirac term at t = 0.
+    """
+    if input_type not in INPUT_TYPES:
+        raise ValueError(f"input_type must be one of {INPUT_TYPES}")
+    num = np.asarray(numerator, dtype=float)
+    den = np.asarray(denominator, dtype=float)
+    single = den.ndim == 1
+    num = np.atleast_2d(num)
+    den = np.atleast_2d(den)
+    if den.shape[1] not in (2, 3) or num.shape[1] > 3:
+        raise ValueError("Only first and second order systems have a closed form response")
+    if num.shape[0] != den.shape[0]:
+        num = np.broadcast_to(num, (den.shape[0], num.shape[1]))
+    # Right align everything into (N, 3)
+    num = np.hstack([np.zeros((num.shape[0], 3 - num.shape[1])), num])
+    den = np.hstack([np.zeros((den.shape[0], 3 - den.shape[1])), den])
+
+    t = np.asarray(t, dtype=float)[None, :]
+    first, d, b1, b0, a1, a0, valid = (x[:, None] for x in _split_proper(num, den))
+    A = np.broadcast_to(np.asarray(amplitude, dtype=float), (den.shape[0],))[:, None]
+
+    with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+        # First order: b0/(s + a0)
+        e1 = np.exp(-a0 * t)
+        if input_type == 'impulse':
+            y1 = b0 * e1
+        elif input_type == 'step':
+            y1 = b0 / a0 * (1 - e1) + d
+        else:
+            y1 = b0 / a0 * (t - (1 - e1) / a0) + d * t
+
+        # Second order: (b1 s + b0)/(s^2 + a1 s + a0)
+        sigma = a1 / 2
+        decay, c, s = _damped_basis(a1, a0, t)
+        if input_type == 'impulse':
+            y2 = decay * (b1 * c + (b0 - b1 * sigma) * s)
+        elif input_type == 'step':
+            y2 = b0 / a0 * (1 - decay * (c + sigma * s)) + b1 * decay * s + d
+        else:
+            # 1/(s^2 D) = 1/(a0 s^2) - a1/(a0^2 s) + (C s + E)/D
+            C = a1 / a0**2
+            E = a1**2 / a0**2 - 1 / a0
+            ramp = t / a0 - a1 / a0**2 + decay * (C * c + (E - C * sigma) * s)
+            y2 = b1 / a0 * (1 - decay * (c + sigma * s)) + b0 * ramp + d * t
+
+    y = np.where(first, y1, y2) * A
+    y = np.where(valid, y, np.nan)
+    return y[0] if single else y
+
+
+class ModalStepResponse:
+    """
+    Step response of an arbitrary order transfer function evaluated at any time points.
+
+    For distinct poles the response is built from the partial fraction expansion
+        y(t) = G(0) + sum_i N(p_i)/(p_i D'(p_i)) e^(p_i t)
+    so no time stepping is needed. Repeated (or nearly repeated) poles make the
+    residues ill-conditioned, in which case the response falls back to the matrix
+    exponential of the controllable companion form.
+    """
+
+    def __init__(self, numerator, denominator):
+        num = np.trim_zeros(np.atleast_1d(np.asarray(numerator, dtype=float)), 'f')
+        den = np.trim_zeros(np.atleast_1d(np.asarray(denominator, dtype=float)), 'f')
+        if len(den) < 2 or len(num) > len(den):
+            raise ValueError("Transfer function must be proper with at least one pole")
+        self.num = num / den[0]
+        self.den = den / den[0]
+        self.order = len(self.den) - 1
+        self.poles = np.roots(self.den)
+        self.dc_gain = self.num[-1] / self.den[-1] if self.den[-1] != 0 else np.inf
+
+        dden = np.polyder(self.den)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self._h_res = np.polyval(self.num, self.poles) / np.polyval(dden, self.poles)
+            self._y_res = self._h_res / self.poles
+        scale = max(np.max(np.abs(self.poles)), 1.0)
+        gaps = np.abs(self.poles[:, None] - self.poles[None, :])
+        np.fill_diagonal(gaps, np.inf)
+        # Clustered poles give huge, cancelling residues; np.roots splits a triple
+        # root by ~eps^(1/3), so the gap test has to be fairly loose
+        self.modal = (np.min(gaps) > 1e-3 * scale and np.all(self.poles != 0)
+                      and np.all(np.isfinite(self._y_res))
+                      and np.max(np.abs(self._y_res)) < 1e6 * max(abs(self.dc_gain), 1.0))
+        if not self.modal:
+            self._build_state_space()
+
+    def _build_state_space(self):
+        # Controllable canonical form of the strictly proper part plus feedthrough
+        n = self.order
+        num = np.concatenate([np.zeros(n + 1 - len(self.num)), self.num])
+        self._D = num[0]
+        rem = num[1:] - self._D * self.den[1:]
+        A = np.zeros((n, n))
+        A[0, :] = -self.den[1:]
+        A[1:, :-1] = np.eye(n - 1)
+        self._A = A
+        self._C = rem
+
+    def _expm_states(self, t: np.ndarray):
+        """Return x(t) for a unit step and x'(t), with B = e_1, via one batched expm."""
+        from scipy.linalg import expm
+
+        n = self.order
+        aug = np.zeros((n + 1, n + 1))
+        aug[:n, :n] = self._A
+        aug[0, n] = 1.0
+        phi = expm(aug[None, :, :] * t[:, None, None])
+        x = phi[:, :n, n]
+        xdot = x @ self._A.T
+        xdot[:, 0] += 1.0
+        return x, xdot
+
+    def evaluate(self, t):
+        """Return the unit step response and its first two time derivatives at t in one pass."""
+        t = np.asarray(t, dtype=float)
+        if self.modal:
+            modes = np.exp(np.multiply.outer(t, self.poles))
+            return (self.dc_gain + np.real(modes @ self._y_res), np.real(modes @ self._h_res),
+                    np.real(modes @ (self._h_res * self.poles)))
+        x, xdot = self._expm_states(t.ravel())
+        xddot = xdot @ self._A.T
+        y, dy, d2y = ((v @ self._C).reshape(t.shape) for v in (x, xdot, xddot))
+        return y + self._D, dy, d2y
+
+    def __call__(self, t) -> np.ndarray:
+        """Unit step response y(t)."""
+        t = np.asarray(t, dtype=float)
+        if self.modal:
+            y = self.dc_gain + np.real(np.exp(np.multiply.outer(t, self.poles)) @ self._y_res)
+            return y
+        x, _ = self._expm_states(t.ravel())
+        return (x @ self._C + self._D).reshape(t.shape)
@@ -0,0 +1,216 @@
+"""
+Streaming batch front end for system_identifier.
+
+Reads rows of transfer function coefficients from a CSV or .npy file in fixed size
+chunks, runs each chunk through BatchParameterCalculation and appends the results
+to a CSV or .npy file, so memory use only depends on the chunk size.
+
+Each input row holds the numerator coefficients followed by the denominator
+coefficients, both in descending order of s. `--num-width` says how many of the
+leading columns belong to the numerator.
+
+Example:
+    python batch_analysis.py designs.csv results.csv --num-width 1 --chunk-size 100000
+"""
+import argparse
+import itertools
+import struct
+import sys
+import time
+from typing import Iterator
+
+import numpy as np
+
+from system_identifier import (RESULT_DTYPE, RESULT_FIELDS, BatchParameterCalculation, ParameterCalculation,
+                               ResultTable)
+
+
+def count_rows(path: str) -> int:
+    """Count the data rows of a CSV/.npy file without loading it."""
+    if path.endswith('.npy'):
+        return np.load(path, mmap_mode='r').shape[0]
+    # Blank lines (e.g. trailing ones) are skipped by the reader, so they are not rows
+    with open(path, 'rb') as f:
+        for _ in range(_header_lines(path)):
+            next(f)
+        return sum(1 for line in f if line.strip())
+
+
+def _header_lines(path: str) -> int:
+    """Number of leading lines of a CSV file that are not numeric rows."""
+    skipped = 0
+    with open(path) as f:
+        for line in f:
+            try:
+                [float(x) for x in line.split(',')]
+                break
+            except ValueError:
+                skipped += 1
+    return skipped
+
+
+def iter_coefficient_chunks(path: str, chunk_size: int) -> Iterator[np.ndarray]:
+    """Yield (chunk_size, width) float arrays of coefficient rows from a CSV or .npy file."""
+    if path.endswith('.npy'):
+        data = np.load(path, mmap_mode='r')
+        for start in range(0, data.shape[0], chunk_size):
+            yield np.asarray(data[start:start + chunk_size], dtype=float)
+        return
+
+    with open(path) as f:
+        for _ in range(_header_lines(path)):
+            next(f)
+        while True:
+            lines = list(itertools.islice(f, chunk_size))
+            if not lines:
+                return
+            lines = [line for line in lines if line.strip()]
+            if lines:
+                yield np.loadtxt(lines, delimiter=',', ndmin=2)
+
+
+def analyze_chunk(coeffs: np.ndarray, num_width: int, input_value: float = 1.0,
+                  reduction_tolerance: float = None) -> np.ndarray:
+    """
+    Analyze one chunk of coefficient rows and return a RESULT_DTYPE record array.
+
+    With reduction_tolerance, higher order rows whose dominant pole model (see
+    model_reduction.py) has an error bound within the tolerance take the closed form
+    metrics of that model, and only the rest are simulated.
+    """
+    num = coeffs[:, :num_width]
+    den = coeffs[:, num_width:]
+    if den.shape[1] < 2:
+        # No pole at all, every row is invalid
+        return ResultTable.empty(coeffs.shape[0]).records
+    if den.shape[1] <= 3:
+        return BatchParameterCalculation(num, den, input_value).to_table().records
+
+    out = np.zeros(coeffs.shape[0], dtype=RESULT_DTYPE)
+    remaining = np.arange(coeffs.shape[0])
+    if reduction_tolerance is not None:
+        from model_reduction import dominant_pole_reduction, reduced_metrics
+
+        reduced = dominant_pole_reduction(num, den)
+        accepted = reduced.error_bound <= reduction_tolerance
+        out[accepted] = reduced_metrics(reduced, input_value).records[accepted]
+        out['order'][accepted] = den.shape[1] - 1 - np.argmax(den[accepted] != 0, axis=1)
+        remaining = np.flatnonzero(~accepted)
+
+    # Higher order rows have no closed form, fall back to one ParameterCalculation per row
+    for i in remaining:
+        row_den = np.trim_zeros(den[i], 'f')
+        try:
+            params = ParameterCalculation(num[i], row_den, len(row_den) - 1, input_value)
+        except (ValueError, ZeroDivisionError, IndexError):
+            out[i] = (0, False) + (np.nan,) * (len(RESULT_FIELDS) - 2)
+            continue
+        values = tuple(np.nan if v is None else v
+                       for v in (getattr(params, name, None) for name in RESULT_FIELDS[2:]))
+        # numeric_step_metrics gives NaN metrics for unstable and zero gain plants, which
+        # BatchParameterCalculation flags invalid as well
+        valid = bool(np.isfinite(values[RESULT_FIELDS.index('Ts_1') - 2]))
+        out[i] = (params.order, valid) + values
+    return out
+
+
+class _CsvWriter:
+    def __init__(self, path: str):
+        self.f = open(path, 'w')
+        self.f.write(','.join(RESULT_FIELDS) + '\n')
+
+    def write(self, start: int, records: np.ndarray):
+        fmt = ['%d', '%d'] + ['%.10g'] * (len(RESULT_FIELDS) - 2)
+        columns = np.column_stack([records[name] for name in RESULT_FIELDS])
+        np.savetxt(self.f, columns, delimiter=',', fmt=fmt)
+
+    def close(self):
+        self.f.close()
+
+
+class _NpyWriter:
+    """
+    Appends RESULT_DTYPE chunks to a .npy file without knowing the row count up front.
+
+    The header is written with room for any shape and rewritten with the real row
+    count on close, so the input does not have to be read twice.
+    """
+
+    def __init__(self, path: str):
+        self.f = open(path, 'wb')
+        self.rows = 0
+        # Large enough for the longest shape, a multiple of 64 bytes as the format asks
+        longest = len(self._header_dict(np.iinfo(np.int64).max)) + 11
+        self.header_size = -(-longest // 64) * 64
+        self.f.write(self._header(0))
+
+    @staticmethod
+    def _header_dict(rows: int) -> bytes:
+        return repr(dict(descr=np.lib.format.dtype_to_descr(RESULT_DTYPE), fortran_order=False,
+                         shape=(rows,))).encode('latin1')
+
+    def _header(self, rows: int) -> bytes:
+        # Version 1.0 layout: magic, little endian uint16 length, then the dict padded
+        # with spaces and ended by a newline
+        header = self._header_dict(rows)
+        header += b' ' * (self.header_size - 10 - len(header) - 1) + b'\n'
+        return np.lib.format.magic(1, 0) + struct.pack('<H', len(header)) + header
+
+    def write(self, start: int, records: np.ndarray):
+        self.f.write(np.ascontiguousarray(records, dtype=RESULT_DTYPE).tobytes())
+        self.rows += len(records)
+
+    def close(self):
+        self.f.seek(0)
+        self.f.write(self._header(self.rows))
+        self.f.close()
+
+
+def run_batch(input_path: str, output_path: str, num_width: int = 1, input_value: float = 1.0,
+              chunk_size: int = 100_000, progress: bool = True, reduction_tolerance: float = None) -> int:
+    """
+    Stream input_path through the analysis into output_path.
+
+    Returns:
+        int: Number of rows processed.
+    """
+    # Only a .npy input knows its length without an extra pass over the file
+    total = count_rows(input_path) if input_path.endswith('.npy') else None
+    writer = (_NpyWriter if output_path.endswith('.npy') else _CsvWriter)(output_path)
+    done = 0
+    start_time = time.perf_counter()
+    try:
+        for chunk in iter_coefficient_chunks(input_path, chunk_size):
+            writer.write(done, analyze_chunk(chunk, num_width, input_value, reduction_tolerance))
+            done += len(chunk)
+            if progress:
+                rate = done / max(time.perf_counter() - start_time, 1e-12)
+                of_total = '' if total is None else f"/{total}"
+                print(f"\r{done}{of_total} rows  {rate:,.0f} rows/s", end='', file=sys.stderr, flush=True)
+    finally:
+        writer.close()
+    if progress:
+        elapsed = time.perf_counter() - start_time
+        print(f"\nProcessed {done} rows in {elapsed:.2f} s ({done / max(elapsed, 1e-12):,.0f} rows/s)",
+              file=sys.stderr)
+    return done
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch step response analysis of transfer function coefficient rows.")
+    parser.add_argument('input', help="CSV or .npy file, one system per row (numerator then denominator)")
+    parser.add_argument('output', help="Result file, .csv or .npy (structured array)")
+    parser.add_argument('--num-width', type=int, default=1, help="Number of numerator columns (default 1)")
+    parser.add_argument('--input-amplitude', type=float, default=1.0, help="Step input amplitude (default 1)")
+    parser.add_argument('--chunk-size', type=int, default=100_000, help="Rows per chunk (default 100000)")
+    parser.add_argument('--reduce-tolerance', type=float, default=None,
+                        help="Use dominant pole models for higher order rows whose step response error "
+                             "bound is within this fraction of the final value (default: always simulate)")
+    parser.add_argument('--quiet', action='store_true', help="Do not report progress")
+    args = parser.parse_args(argv)
+    run_batch(args.input, args.output, args.num_width, args.input_amplitude, args.chunk_size, not args.quiet,
+              args.reduce_tolerance)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,392 @@
+"""
+Benchmark suite for the simulation and analysis hot paths.
+
+Every benchmark is a setup function that takes a problem size and returns the
+callable to time, so the setup (building inputs, constructing plants) is not
+counted. Results are written to JSON and can be compared against an earlier run
+to flag regressions.
+
+Example:
+    python benchmarks.py --output before.json
+    # ... change something ...
+    python benchmarks.py --baseline before.json --output after.json --threshold 0.2
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import re
+import sys
+import time
+import warnings
+from datetime import datetime, timezone
+
+import numpy as np
+
+BENCHMARKS = {}
+
+SCALES = ('small', 'medium', 'large')
+
+
+def benchmark(name: str, small, medium, large):
+    """Register a setup function with the problem sizes used at each scale."""
+    def register(setup):
+        BENCHMARKS[name] = dict(setup=setup, sizes=dict(small=small, medium=medium, large=large),
+                                doc=(setup.__doc__ or '').strip())
+        return setup
+    return register
+
+
+# ----------------------------------------------------------------- free response paths
+# The same free response computed the four ways the repo does it.
+
+@benchmark('free/quickcopy_loop', small=[100], medium=[1_000], large=[10_000])
+def _quickcopy_loop(n):
+    """quickcopy.py: Python loop appending one sample per step for the four regimes."""
+    M, K, x_o, v = 1, 1, 1, 1
+    Z3, Z4 = 1.5, 0.5
+    wn = np.sqrt(K/M)
+
+    def run():
+        tarray, y1, y2, y3, y4 = [], [], [], [], []
+        for i in range(n):
+            t = 15 * i / n
+            tarray.append(t)
+            y1.append(x_o * np.cos(wn * t) + (v / wn) * np.sin(wn * t))
+            y2.append(np.exp(-1 * wn * t) * ((wn * x_o + v) * t + x_o))
+            y3.append(np.exp(-Z3 * wn * t) * (
+                x_o * np.cosh(wn * np.sqrt(Z3**2 - 1) * t) +
+                (1 / np.sqrt(Z3**2 - 1)) * (Z3 * x_o + v / wn) * np.sinh(wn * np.sqrt(Z3**2 - 1) * t)))
+            y4.append(np.exp(-Z4 * wn * t) * (
+                x_o * np.cos((wn * np.sqrt(1 - Z4**2)) * t) +
+                (1 / np.sqrt(1 - Z4**2)) * (Z4 * x_o + v / wn) * np.sin((wn * np.sqrt(1 - Z4**2)) * t)))
+        return y4
+    return run
+
+
+@benchmark('free/program1_vectorized', small=[1_000], medium=[100_000], large=[1_000_000])
+def _program1_vectorized(n):
+    """program1.py: vectorized underdamped formula for three damping ratios."""
+    wn, x0, v0 = 5, 0, 60
+    zeta = np.array([0.05, 0.1, 0.2])
+    t = np.linspace(0, 6, n)
+
+    def run():
+        for z in zeta:
+            wd = np.sqrt(1 - z**2) * wn
+            x = np.exp(-z * wn * t) * (((z * x0 + v0) / wd) * np.sin(wd * t) + x0 * np.cos(wd * t))
+        return x
+    return run
+
+
+@benchmark('free/system_calculate_response', small=[1_000], medium=[100_000], large=[1_000_000])
+def _system_calculate_response(n):
+    """system_response.system: declare_case + calculate_response for the four cases."""
+    from system_response import system
+
+    t = np.linspace(0, 30, n)
+    plant = system()
+    cases = ('Not Damped', 'Critically Damped', 'Over Damped', 'Underdamped')
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):  # declare_case prints
+            for case in cases:
+                plant.declare_case(case)
+                plant.calculate_response(t)
+    return run
+
+
+@benchmark('free/free_response', small=[1_000], medium=[100_000], large=[1_000_000])
+def _free_response(n):
+    """system_response.free_response: all four regimes in one call."""
+    from system_response import free_response
+
+    t = np.linspace(0, 30, n)
+    Z = np.array([0.0, 1.0, 1.5, 0.5])[:, None]
+    return lambda: free_response(t, Z)
+
+
+@benchmark('free/odeint', small=[1_000], medium=[10_000], large=[100_000])
+def _odeint(n):
+    """vibrations_functions.py: odeint on the 1000 N step loaded plant."""
+    from scipy.integrate import odeint
+
+    m, c, k = 61.48, 535.8, 40_000
+    t = np.linspace(0, 1.4, n)
+
+    def diffs(x, _):
+        return [x[1], (1000 - c*x[1] - k*x[0]) / m]
+    return lambda: odeint(diffs, [0, 0], t)
+
+
+@benchmark('forced/simulate_zoh', small=[10_000], medium=[1_000_000], large=[10_000_000])
+def _simulate_zoh(n):
+    """zoh_simulation.simulate_zoh on the same plant with a constant force record."""
+    from zoh_simulation import simulate_zoh
+
+    force = np.full(n, 1000.0)
+    return lambda: simulate_zoh(61.48, 535.8, 40_000, force, 1.4 / n)
+
+
+@benchmark('forced/plant_cache_load_cases', small=[10], medium=[1_000], large=[10_000])
+def _plant_cache_load_cases(n):
+    """plant_cache: n load cases of 2000 samples on one cached plant, one stacked call."""
+    from plant_cache import mck_plant
+
+    forces = 1000 * (1 + 0.2 * np.sin(np.outer(np.linspace(1, 20, n), np.arange(2000) * 1e-3)))
+    return lambda: mck_plant(61.48, 535.8, 40_000).simulate(forces, 1e-3)
+
+
+# ------------------------------------------------------------------- analysis paths
+
+def _random_second_order(n, seed=0):
+    rng = np.random.default_rng(seed)
+    wn = rng.uniform(0.5, 20, n)
+    zeta = rng.uniform(0.05, 2, n)
+    return (wn**2)[:, None], np.column_stack([np.ones(n), 2*zeta*wn, wn**2])
+
+
+@benchmark('analysis/ParameterCalculation', small=[10], medium=[100], large=[1_000])
+def _parameter_calculation(n):
+    """system_identifier.ParameterCalculation, one second order plant at a time."""
+    from system_identifier import ParameterCalculation
+
+    num, den = _random_second_order(n)
+
+    def run():
+        for i in range(n):
+            ParameterCalculation(num[i], den[i], 2, 1.0)
+    return run
+
+
+@benchmark('analysis/ParameterCalculation_3rd_order', small=[5], medium=[50], large=[500])
+def _parameter_calculation_higher(n):
+    """ParameterCalculation on third order plants (numeric step metrics)."""
+    from system_identifier import ParameterCalculation
+
+    rng = np.random.default_rng(1)
+    plants = [([26.0 * a], [1, 3 + a, 28 + a, 26 * a]) for a in rng.uniform(0.5, 2, n)]
+
+    def run():
+        for num, den in plants:
+            ParameterCalculation(np.array(num), np.array(den), 3, 1.0)
+    return run
+
+
+@benchmark('analysis/BatchParameterCalculation', small=[1_000], medium=[100_000], large=[1_000_000])
+def _batch_parameter_calculation(n):
+    """system_identifier.BatchParameterCalculation on a stack of second order plants."""
+    from system_identifier import BatchParameterCalculation
+
+    num, den = _random_second_order(n)
+    return lambda: BatchParameterCalculation(num, den, 1.0)
+
+
+@benchmark('analysis/batch_roots', small=[1_000], medium=[100_000], large=[1_000_000])
+def _batch_roots(n):
+    """poles.batch_roots on third order characteristic polynomials."""
+    from poles import batch_roots
+
+    dens = np.column_stack([np.ones(n), np.random.default_rng(2).uniform(0.1, 50, (n, 3))])
+    return lambda: batch_roots(dens)
+
+
+@benchmark('analysis/dominant_pole_reduction', small=[1_000], medium=[100_000], large=[1_000_000])
+def _dominant_pole_reduction(n):
+    """model_reduction: reduce a stack of 3rd order plants and take the reduced metrics."""
+    from model_reduction import dominant_pole_reduction, reduced_metrics
+
+    _, den = _random_second_order(n)
+    # (a s^2 + b s + c)(s + p) with the extra real pole p well outside the pair
+    a, b, c = den.T
+    p = 20 * b / a
+    dens = np.column_stack([a, a * p + b, b * p + c, c * p])
+    nums = dens[:, -1:].copy()
+    return lambda: reduced_metrics(dominant_pole_reduction(nums, dens))
+
+
+@benchmark('analysis/batch_frequency_response', small=[100], medium=[10_000], large=[100_000])
+def _batch_frequency_response(n):
+    """frequency_response.batch_frequency_response over 512 frequencies."""
+    from frequency_response import batch_frequency_response
+
+    num, den = _random_second_order(n)
+    omega = np.logspace(-2, 3, 512)
+    return lambda: batch_frequency_response(num, den, omega, keep_response=False)
+
+
+# ------------------------------------------------------------------- plotting paths
+
+@benchmark('plot/control_step_response', small=[1], medium=[10], large=[100])
+def _control_step_response(n):
+    """control.step_response on 1000 points, as in HW10_program.py."""
+    import control as ct
+
+    systems = [ct.TransferFunction([26], [1, 3, 28, 26]) for _ in range(n)]
+    t = np.linspace(0, 10, 1000)
+
+    def run():
+        for sys_ in systems:
+            ct.step_response(sys_, t)
+    return run
+
+
+@benchmark('plot/ParameterCalculation_plots', small=[1], medium=[5], large=[20])
+def _parameter_calculation_plots(n):
+    """ParameterCalculation.plot_response + pole_plot + step_plot rendered off screen."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from system_identifier import ParameterCalculation
+
+    params = ParameterCalculation(np.array([26.0]), np.array([1.0, 3, 28, 26]), 3, 1.0)
+
+    def run():
+        for _ in range(n):
+            params.plot_response(show=False)
+            params.pole_plot(show=False)
+            params.step_plot(show=False)
+            plt.gcf().canvas.draw()
+            plt.close('all')
+    return run
+
+
+@benchmark('plot/system_plot_response', small=[1], medium=[5], large=[20])
+def _system_plot_response(n):
+    """system_response.system.plot_response for all four cases, rendered off screen."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from system_response import system
+
+    plant = system()
+
+    def run():
+        # plt.show() is a no-op under Agg, so the figure is still current afterwards
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(n):
+                plant.plot_response(30, True, True, True, True)
+                plt.gcf().canvas.draw()
+                plt.close('all')
+    return run
+
+
+@benchmark('plot/report_renderer', small=[5], medium=[50], large=[500])
+def _report_renderer(n):
+    """report_rendering.ReportRenderer: reused Agg figure written to PNG, n reports."""
+    import tempfile
+    from report_rendering import ReportRenderer
+
+    renderer = ReportRenderer()
+    out_dir = tempfile.TemporaryDirectory()  # removed once run() is garbage collected
+    num, den = _random_second_order(n)
+
+    def run():
+        for i in range(n):
+            renderer.render(num[i], den[i], f"{out_dir.name}/report_{i}.png")
+    return run
+
+
+# ------------------------------------------------------------------------ harness
+
+def time_benchmark(setup, size: int, repeat: int = 5, min_time: float = 0.2) -> dict:
+    """
+    Time one benchmark at one size.
+
+    The callable is run enough times per repeat to take at least min_time seconds
+    (at least once), and the best per-call time over the repeats is reported, as
+    timeit recommends, since slower repeats only measure interference.
+    """
+    run = setup(size)
+    start = time.perf_counter()
+    run()  # warm up imports and caches, and calibrate the loop count
+    once = time.perf_counter() - start
+    number = max(1, int(min_time / max(once, 1e-9)))
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            run()
+        times.append((time.perf_counter() - start) / number)
+    return dict(best=min(times), median=float(np.median(times)), number=number, repeat=repeat)
+
+
+def run_benchmarks(scale: str = 'small', pattern: str = None, repeat: int = 5, min_time: float = 0.2,
+                   progress: bool = True) -> dict:
+    """Run every registered benchmark matching pattern (a regex) and return the JSON document."""
+    results = {}
+    for name, entry in BENCHMARKS.items():
+        if pattern and not re.search(pattern, name):
+            continue
+        for size in entry['sizes'][scale]:
+            key = f"{name}[{size}]"
+            with warnings.catch_warnings():
+                # Deprecation and nan warnings from the code under test are not results
+                warnings.simplefilter('ignore')
+                results[key] = time_benchmark(entry['setup'], size, repeat, min_time)
+            if progress:
+                print(f"{key:<48} {results[key]['best'] * 1e3:12.3f} ms", file=sys.stderr)
+    return dict(
+        meta=dict(timestamp=datetime.now(timezone.utc).isoformat(timespec='seconds'), scale=scale,
+                  python=platform.python_version(), numpy=np.__version__, machine=platform.machine(),
+                  platform=platform.platform()),
+        results=results)
+
+
+def compare(current: dict, baseline: dict, threshold: float = 0.2) -> list:
+    """
+    Compare two result documents.
+
+    Returns:
+        list: (key, baseline seconds, current seconds, ratio) for every benchmark that
+            got slower by more than threshold (0.2 = 20%).
+    """
+    regressions = []
+    for key, result in current['results'].items():
+        old = baseline['results'].get(key)
+        if old is None:
+            continue
+        ratio = result['best'] / old['best']
+        if ratio > 1 + threshold:
+            regressions.append((key, old['best'], result['best'], ratio))
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the simulation and analysis hot paths.")
+    parser.add_argument('--scale', choices=SCALES, default='small', help="Problem sizes (default small)")
+    parser.add_argument('--filter', help="Only run benchmarks whose name matches this regex")
+    parser.add_argument('--repeat', type=int, default=5, help="Timing repeats (default 5)")
+    parser.add_argument('--min-time', type=float, default=0.2, help="Minimum seconds per repeat (default 0.2)")
+    parser.add_argument('--output', help="Write results to this JSON file")
+    parser.add_argument('--baseline', help="Earlier JSON results to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Flag benchmarks slower than baseline by this fraction (default 0.2)")
+    parser.add_argument('--list', action='store_true', help="List the benchmarks and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, entry in BENCHMARKS.items():
+            print(f"{name:<40} {entry['doc']}")
+        return 0
+
+    current = run_benchmarks(args.scale, args.filter, args.repeat, args.min_time)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        for key, old, new, ratio in regressions:
+            print(f"REGRESSION {key}: {old * 1e3:.3f} ms -> {new * 1e3:.3f} ms ({ratio:.2f}x)")
+        if regressions:
+            return 1
+        print(f"No regressions over {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
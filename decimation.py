@@ -0,0 +1,103 @@
+import numpy as np
+
+# Display-resolution decimation of long time series before they are handed to
+# matplotlib. A line plot can not show more than a couple of points per pixel column,
+# so handing it millions of samples only costs time and memory. Both methods keep
+# the visually important points, in particular peaks and overshoot:
+#   - minmax: first/last sample plus the min and max of every pixel column (an exact
+#     envelope, 2 points per column)
+#   - lttb: Largest-Triangle-Three-Buckets, one point per bucket chosen to preserve
+#     the shape of the curve (smoother looking, not an exact envelope)
+
+
+def minmax_decimate(t, y, n_columns: int):
+    """
+    Min/max envelope: the smallest and largest sample of each of n_columns equal
+    index buckets, in time order, plus the first and last sample.
+
+    Returns:
+        tuple: (t, y) with at most 2 n_columns + 2 points (inputs returned unchanged
+            if they are not longer than that).
+    """
+    t = np.asarray(t)
+    y = np.asarray(y)
+    n = y.shape[0]
+    if n <= 2 * n_columns + 2:
+        return t, y
+    bucket = int(np.ceil(n / n_columns))
+    n_full = n // bucket
+    # Full buckets as rows of a 2-D view, the (short) remainder separately
+    body = y[:n_full * bucket].reshape(n_full, bucket)
+    offsets = np.arange(n_full) * bucket
+    index = [[0, n - 1], offsets + np.argmin(body, axis=1), offsets + np.argmax(body, axis=1)]
+    if n_full * bucket < n:
+        tail = y[n_full * bucket:]
+        index.append(n_full * bucket + np.array([np.argmin(tail), np.argmax(tail)]))
+    # np.unique sorts, which puts every column's min and max back in time order
+    index = np.unique(np.concatenate(index))
+    return t[index], y[index]
+
+
+def lttb(t, y, n_out: int):
+    """
+    Largest-Triangle-Three-Buckets downsampling to n_out points (Steinarsson, 2013).
+
+    The first and last sample are kept. Every bucket in between contributes the point
+    forming the largest triangle with the point kept from the previous bucket and the
+    mean of the next bucket.
+    """
+    t = np.asarray(t, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = y.shape[0]
+    if n_out >= n or n_out < 3:
+        return t, y
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # Mean of every bucket in one pass, used as the third triangle corner
+    sum_t = np.add.reduceat(t[1:n - 1], edges[:-1] - 1)
+    sum_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    count = np.diff(edges)
+    mean_t = np.append(sum_t / count, t[-1])
+    mean_y = np.append(sum_y / count, y[-1])
+
+    chosen = np.empty(n_out, dtype=np.int64)
+    chosen[0], chosen[-1] = 0, n - 1
+    previous = 0
+    for b in range(n_out - 2):
+        start, stop = edges[b], edges[b + 1]
+        ts, ys = t[start:stop], y[start:stop]
+        # Twice the triangle area, the constant factor does not change the argmax
+        area = np.abs((t[previous] - mean_t[b + 1]) * (ys - y[previous]) -
+                      (t[previous] - ts) * (mean_y[b + 1] - y[previous]))
+        previous = start + int(np.argmax(area))
+        chosen[b + 1] = previous
+    return t[chosen], y[chosen]
+
+
+METHODS = {'minmax': lambda t, y, columns: minmax_decimate(t, y, columns),
+           'lttb': lambda t, y, columns: lttb(t, y, 2 * columns)}
+
+
+def display_columns(ax, default: int = 1000) -> int:
+    """Width of a matplotlib Axes in pixels (default if there is no figure yet)."""
+    try:
+        return max(int(np.ceil(ax.get_window_extent().width)), 1)
+    except (AttributeError, ValueError):
+        return default
+
+
+def decimate(t, y, columns: int, method: str = 'minmax'):
+    """Reduce (t, y) for a plot columns pixels wide with 'minmax' or 'lttb'."""
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {tuple(METHODS)}")
+    return METHODS[method](t, y, columns)
+
+
+def plot_decimated(ax, t, y, *args, method: str = 'minmax', columns: int = None, **kwargs):
+    """
+    ax.plot(t, y, ...) with (t, y) first decimated to the width of ax.
+
+    The cost of the plot then depends on the display width instead of len(t).
+    Extra arguments go to ax.plot, and its return value is passed back.
+    """
+    t_plot, y_plot = decimate(t, y, columns or display_columns(ax), method)
+    return ax.plot(t_plot, y_plot, *args, **kwargs)
@@ -0,0 +1,266 @@
+import numpy as np
+
+# Steady state frequency response of the mass-spring-damper versus frequency ratio
+# r = w/wn, the Python version of the HW05_P4/P5/P6 MATLAB scripts. All functions
+# broadcast, so r[:, None] against zeta[None, :] gives the full (r x zeta) grid in one
+# call, and the peaks come from closed forms instead of scanning the grid.
+# batch_frequency_response does the same for arbitrary transfer functions G(jw).
+
+
+def force_response(r, zeta):
+    """KX/F, displacement amplitude under a harmonic force (HW05_P5)."""
+    r, zeta = np.asarray(r, dtype=float), np.asarray(zeta, dtype=float)
+    with np.errstate(divide='ignore'):
+        return 1 / np.sqrt((1 - r**2)**2 + (2*zeta*r)**2)
+
+
+def base_transmissibility(r, zeta):
+    """X/Y, displacement transmissibility under base excitation (HW05_P6)."""
+    r, zeta = np.asarray(r, dtype=float), np.asarray(zeta, dtype=float)
+    with np.errstate(divide='ignore'):
+        return np.sqrt((1 + (2*zeta*r)**2) / ((1 - r**2)**2 + (2*zeta*r)**2))
+
+
+def rotating_unbalance(r, zeta):
+    """MX/(me), amplitude of a rotating unbalance (HW05_P4)."""
+    r, zeta = np.asarray(r, dtype=float), np.asarray(zeta, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return r**2 / np.sqrt((1 - r**2)**2 + (2*zeta*r)**2)
+
+
+RESPONSES = {
+    'force': force_response,
+    'base': base_transmissibility,
+    'unbalance': rotating_unbalance,
+}
+
+
+def response_grid(kind: str, r, zeta, out_path: str = None, chunk_rows: int = 65536) -> np.ndarray:
+    """
+    Evaluate one response over the full (r x zeta) grid.
+
+    Args:
+        kind (str): 'force', 'base' or 'unbalance'.
+        r (array-like): Frequency ratios, shape (R,).
+        zeta (array-like): Damping ratios, shape (Z,).
+        out_path (str): If given, the grid is written to this .npy file through a
+            memory map, chunk_rows values of r at a time, for grids bigger than RAM.
+        chunk_rows (int): Rows of r evaluated per chunk when writing to out_path.
+
+    Returns:
+        np.ndarray: Shape (R, Z), a memory-mapped array when out_path is given.
+    """
+    if kind not in RESPONSES:
+        raise ValueError(f"kind must be one of {tuple(RESPONSES)}")
+    func = RESPONSES[kind]
+    r = np.asarray(r, dtype=float).ravel()
+    zeta = np.asarray(zeta, dtype=float).ravel()
+    if out_path is None:
+        return func(r[:, None], zeta[None, :])
+
+    out = np.lib.format.open_memmap(out_path, mode='w+', dtype=np.float64, shape=(r.size, zeta.size))
+    for start in range(0, r.size, chunk_rows):
+        out[start:start + chunk_rows] = func(r[start:start + chunk_rows, None], zeta[None, :])
+    out.flush()
+    return out
+
+
+def response_peak(kind: str, zeta):
+    """
+    Location and height of the resonant peak, in closed form.
+
+    Args:
+        kind (str): 'force', 'base' or 'unbalance'.
+        zeta (array-like): Damping ratios.
+
+    Returns:
+        tuple: (r_peak, height) arrays shaped like zeta. For force and unbalance with
+            zeta >= 1/sqrt(2) there is no resonance and the maximum sits at r = 0
+            (force, height 1) or r -> inf (unbalance, height 1). zeta = 0 gives an
+            infinite peak at r = 1.
+    """
+    if kind not in RESPONSES:
+        raise ValueError(f"kind must be one of {tuple(RESPONSES)}")
+    zeta = np.asarray(zeta, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        resonant = zeta < 1/np.sqrt(2)
+        # Same peak height for force and unbalance: 1/(2 zeta sqrt(1 - zeta^2))
+        height = np.where(resonant, 1 / (2*zeta*np.sqrt(1 - zeta**2)), 1.0)
+        if kind == 'force':
+            r_peak = np.where(resonant, np.sqrt(1 - 2*zeta**2), 0.0)
+        elif kind == 'unbalance':
+            r_peak = np.where(resonant, 1 / np.sqrt(1 - 2*zeta**2), np.inf)
+        else:
+            # d/dr of the transmissibility vanishes at r^2 = (sqrt(1 + 8 zeta^2) - 1)/(4 zeta^2),
+            # written without the 0/0 at zeta = 0
+            r_peak = np.sqrt(2 / (np.sqrt(1 + 8*zeta**2) + 1))
+            height = base_transmissibility(r_peak, zeta)
+    return r_peak, height
+
+
+def _horner(coeffs: np.ndarray, s: np.ndarray) -> np.ndarray:
+    """Evaluate a (N, m) stack of polynomials at the points s, shape (N, len(s))."""
+    acc = np.broadcast_to(coeffs[:, :1].astype(complex), (coeffs.shape[0], s.size)).copy()
+    for i in range(1, coeffs.shape[1]):
+        acc *= s
+        acc += coeffs[:, i:i + 1]
+    return acc
+
+
+def _first_crossing(found, value, w, f0, f1, crossed, targets=None):
+    """
+    Record, for rows not yet in `found`, the first interval where `crossed` is True.
+
+    f0 and f1 are the zero-crossing function at the left and right end of every
+    interval, shape (N, W - 1), interpolated linearly in w. The crossing
+    frequency goes into value[0] and each array in `targets`, interpolated at the
+    same point, into value[1:], all in place.
+    """
+    has = crossed.any(axis=1) & ~found
+    i = np.argmax(crossed, axis=1)
+    rows = np.arange(f0.shape[0])
+    f0, f1 = f0[rows, i], f1[rows, i]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        frac = np.where(f1 != f0, f0 / (f0 - f1), 0.0)
+    w_cross = w[i] + frac * (w[i + 1] - w[i])
+    value[0][has] = w_cross[has]
+    for out, target in zip(value[1:], targets or []):
+        t0, t1 = target[rows, i], target[rows, i + 1]
+        out[has] = (t0 + frac * (t1 - t0))[has]
+    found |= has
+
+
+def batch_frequency_response(numerators, denominators, omega, chunk_size: int = 1024,
+                             keep_response: bool = True) -> dict:
+    """
+    Frequency response G(jw) of a stack of transfer functions on a shared frequency grid.
+
+    The polynomials are evaluated with vectorized Horner steps, a chunk of frequencies at a
+    time, and the summary metrics are updated incrementally from chunk to chunk, so with
+    keep_response=False memory only depends on N x chunk_size.
+
+    Args:
+        numerators (array-like): (N, m) numerator coefficients, descending powers of s.
+        denominators (array-like): (N, n) denominator coefficients, descending powers of s.
+        omega (array-like): Increasing frequencies in rad/s, shape (W,).
+        chunk_size (int): Frequencies evaluated per chunk.
+        keep_response (bool): Also return the full magnitude and phase arrays.
+
+    Returns:
+        dict: Per system arrays of shape (N,):
+            'dc_gain', 'peak_magnitude', 'peak_frequency' (resonant peak on the grid),
+            'bandwidth' (first w where |G| drops below |G(0)|/sqrt(2)),
+            'gain_margin', 'phase_crossover' (|G|^-1 where the phase first crosses -180 deg,
+            w = 0 for a negative DC gain), 'phase_margin', 'gain_crossover' (180 + phase
+            where |G| first crosses 1, wrapped into (-180, 180]).
+            Metrics that never occur on the grid are NaN. With keep_response also
+            'magnitude' and 'phase' (unwrapped, degrees) of shape (N, W).
+    """
+    num = np.atleast_2d(np.asarray(numerators, dtype=float))
+    den = np.atleast_2d(np.asarray(denominators, dtype=float))
+    omega = np.asarray(omega, dtype=float).ravel()
+    n_sys = den.shape[0]
+    if num.shape[0] != n_sys:
+        num = np.broadcast_to(num, (n_sys, num.shape[1]))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dc_gain = np.where(den[:, -1] != 0, num[:, -1] / den[:, -1], np.inf)
+    result = {
+        'dc_gain': dc_gain,
+        'peak_magnitude': np.full(n_sys, -np.inf),
+        'peak_frequency': np.full(n_sys, np.nan),
+    }
+    bandwidth, gain_margin, phase_crossover, phase_margin, gain_crossover = (np.full(n_sys, np.nan) for _ in range(5))
+    found_bw, found_pc, found_gc = (np.zeros(n_sys, dtype=bool) for _ in range(3))
+    # A negative DC gain sits on the -180 deg line at w = 0, the first phase crossover
+    found_pc[:] = np.isfinite(dc_gain) & (dc_gain < 0)
+    phase_crossover[found_pc] = 0.0
+    gain_margin[found_pc] = 1 / np.abs(dc_gain[found_pc])
+    if keep_response:
+        result['magnitude'] = np.empty((n_sys, omega.size))
+        result['phase'] = np.empty((n_sys, omega.size))
+
+    prev = None
+    for start in range(0, omega.size, chunk_size):
+        w = omega[start:start + chunk_size]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            G = _horner(num, 1j * w) / _horner(den, 1j * w)
+        mag = np.abs(G)
+        phase = np.angle(G)
+        if prev is not None:
+            # Continue the unwrap from the last point of the previous chunk
+            phase = np.unwrap(np.hstack([np.deg2rad(prev[2][:, None]), phase]), axis=1)[:, 1:]
+        else:
+            phase = np.unwrap(phase, axis=1)
+        phase = np.rad2deg(phase)
+
+        better = mag.max(axis=1) > result['peak_magnitude']
+        k = np.argmax(mag, axis=1)
+        result['peak_magnitude'] = np.where(better, mag[np.arange(n_sys), k], result['peak_magnitude'])
+        result['peak_frequency'] = np.where(better, w[k], result['peak_frequency'])
+        if keep_response:
+            result['magnitude'][:, start:start + w.size] = mag
+            result['phase'][:, start:start + w.size] = phase
+
+        # Crossings are searched over this chunk plus the last point of the previous one
+        if prev is not None:
+            w_ext = np.concatenate([[prev[0]], w])
+            mag_ext = np.hstack([prev[1][:, None], mag])
+            ph_ext = np.hstack([prev[2][:, None], phase])
+        else:
+            w_ext, mag_ext, ph_ext = w, mag, phase
+        if w_ext.size > 1:
+            f = mag_ext - np.abs(dc_gain)[:, None] / np.sqrt(2)
+            _first_crossing(found_bw, [bandwidth], w_ext, f[:, :-1], f[:, 1:],
+                            (f[:, :-1] >= 0) & (f[:, 1:] < 0))
+
+            f = mag_ext - 1
+            _first_crossing(found_gc, [gain_crossover, phase_margin], w_ext, f[:, :-1], f[:, 1:],
+                            (f[:, :-1] > 0) != (f[:, 1:] > 0), [ph_ext])
+
+            # -180 deg modulo 360: the branch index changes between neighbouring points,
+            # and the level crossed is the one between the two branches of each interval
+            branch = np.floor((ph_ext + 180) / 360)
+            level = 360 * np.maximum(branch[:, :-1], branch[:, 1:]) - 180
+            inv_mag = np.divide(1.0, mag_ext, out=np.full_like(mag_ext, np.inf), where=mag_ext != 0)
+            _first_crossing(found_pc, [phase_crossover, gain_margin], w_ext, ph_ext[:, :-1] - level,
+                            ph_ext[:, 1:] - level, branch[:, :-1] != branch[:, 1:], [inv_mag])
+        prev = (w[-1], mag[:, -1], phase[:, -1])
+
+    # The unwrapped phase may start on any 360 deg branch (e.g. +180 for a double
+    # integrator), so wrap the margin into (-180, 180] like control.margin
+    phase_margin = 180 + phase_margin
+    phase_margin -= 360 * np.ceil((phase_margin - 180) / 360)
+    result.update(bandwidth=bandwidth, gain_margin=gain_margin, phase_crossover=phase_crossover,
+                  phase_margin=phase_margin, gain_crossover=gain_crossover)
+    return result
+
+
+def plot_frequency_response(kind: str, r, zetas, show=True):
+    """Plot one response curve per damping ratio, like the HW05 MATLAB figures."""
+    import matplotlib.pyplot as plt
+
+    labels = {'force': ('Force Response', 'KX/F'),
+              'base': ('Base Excitation', 'X/Y'),
+              'unbalance': ('Rotate Unbalanced', 'MX/me')}
+    grid = response_grid(kind, r, zetas)
+    for j, z in enumerate(np.ravel(zetas)):
+        plt.plot(r, grid[:, j], linewidth=1, label=f'z = {z:g}')
+    title, ylabel = labels[kind]
+    plt.title(title)
+    plt.xlabel('r')
+    plt.ylabel(ylabel)
+    plt.axis([0, np.max(r), 0, 10])
+    plt.grid(True)
+    plt.legend()
+    if show:
+        plt.show()
+
+
+if __name__ == "__main__":
+    r = np.arange(0, 3.01, 0.01)
+    zetas = np.array([0, 0.06, 0.1, 0.2, 0.4, 1])
+    for kind in ('unbalance', 'force', 'base'):
+        r_peak, height = response_peak(kind, zetas)
+        print(f"{kind}: peaks at r = {np.round(r_peak, 3)}, heights {np.round(height, 3)}")
+        plot_frequency_response(kind, r, zetas)
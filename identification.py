@@ -0,0 +1,365 @@
+import numpy as np
+
+from analytic_response import analytic_response
+from system_response import free_response
+
+# System identification: the reverse of system_identifier. Estimates wn, zeta (and the
+# gain) from measured free-decay or step data and returns coefficients that MySystem /
+# ParameterCalculation accept directly.
+#
+# Every estimator takes either an array (a np.memmap works for recordings that do not
+# fit in memory) or any iterable of 1-D chunks, and only ever holds one chunk plus a
+# small fixed amount of state, so 10^8 sample recordings can be streamed.
+
+
+def _iter_chunks(data, chunk_size: int):
+    """Yield 1-D float chunks from an array or an iterable of chunks."""
+    if isinstance(data, np.ndarray):
+        for start in range(0, data.shape[0], chunk_size):
+            yield np.asarray(data[start:start + chunk_size], dtype=float)
+    else:
+        for chunk in data:
+            yield np.asarray(chunk, dtype=float).ravel()
+
+
+def to_coefficients(wn: float, zeta: float, gain: float = 1.0):
+    """Numerator/denominator of gain*wn^2/(s^2 + 2 zeta wn s + wn^2), ready for MySystem."""
+    return np.array([gain * wn**2]), np.array([1.0, 2 * zeta * wn, wn**2])
+
+
+def _result(wn, zeta, gain=1.0, **extra) -> dict:
+    num, den = to_coefficients(wn, zeta, gain)
+    return dict(wn=wn, zeta=zeta, gain=gain, numerator=num, denominator=den, **extra)
+
+
+def _half_cycle_peaks(data, dt: float, offset: float, chunk_size: int):
+    """
+    Yield (time, amplitude) of the largest sample in every positive half cycle.
+
+    Taking one peak per run of samples above the offset, rather than every local
+    maximum, keeps measurement noise from adding spurious peaks. Peaks are refined
+    with a parabola through their neighbours. The last two samples of a chunk are
+    carried into the next one, so a peak on a chunk boundary still gets both
+    neighbours and the result does not depend on the chunk size. Only the best sample
+    of a half cycle that is still open at a chunk boundary is carried over.
+    """
+    carry = np.empty(0)  # last two samples of the previous chunk (offset removed)
+    position = 0         # global index of x[0]
+    open_peak = None     # (time, amplitude, sample, index) of the half cycle open at the chunk end
+    for chunk in _iter_chunks(data, chunk_size):
+        if chunk.size == 0:
+            continue
+        x = np.concatenate([carry, chunk - offset])
+        # carry[-1] is the last sample already assigned to a run, carry[0] only serves
+        # as the left neighbour of a peak on carry[-1]
+        shared = carry.size - 1
+        pos = x > 0
+        pos[:max(shared, 0)] = False
+        edges = np.diff(pos.astype(np.int8))
+        starts = np.nonzero(edges == 1)[0] + 1
+        if pos[0]:
+            starts = np.concatenate([[0], starts])
+        if starts.size:
+            # reduceat over [start_i, start_i+1) also spans the negative samples after
+            # each run, which cannot beat the positive run maximum
+            run_max = np.maximum.reduceat(x, starts)
+            labels = np.cumsum(np.isin(np.arange(x.size), starts)) - 1
+            at_max = (labels >= 0) & (x == run_max[np.maximum(labels, 0)])
+            _, first = np.unique(labels[at_max], return_index=True)
+            k = np.nonzero(at_max)[0][first]
+            inner = (k > 0) & (k < x.size - 1)
+            y0 = np.where(inner, x[np.maximum(k - 1, 0)], x[k])
+            y2 = np.where(inner, x[np.minimum(k + 1, x.size - 1)], x[k])
+            y1 = x[k]
+            denom = y0 - 2 * y1 + y2
+            with np.errstate(divide='ignore', invalid='ignore'):
+                shift = np.where(inner & (denom != 0), 0.5 * (y0 - y2) / denom, 0.0)
+            amps = y1 - 0.25 * (y0 - y2) * shift
+            times = (position + k + shift) * dt
+            peaks = list(zip(times, amps, y1, position + k))
+            if shared >= 0 and pos[shared] and open_peak is not None:
+                # The first run continues the half cycle left open by the last chunk.
+                # Keep the first of equal samples, but the refined copy of the same one
+                sample, index = peaks[0][2:]
+                if open_peak[2] > sample or (open_peak[2] == sample and open_peak[3] < index):
+                    peaks[0] = open_peak
+            elif open_peak is not None:
+                yield open_peak[:2]
+            open_peak = peaks.pop() if pos[-1] else None
+            for peak in peaks:
+                yield peak[:2]
+        elif open_peak is not None:
+            yield open_peak[:2]
+            open_peak = None
+        carry = x[-2:]
+        position += x.size - carry.size
+    if open_peak is not None:
+        yield open_peak[:2]
+
+
+def log_decrement(data, dt: float, offset: float = 0.0, min_height: float = 0.0,
+                  chunk_size: int = 1 << 20) -> dict:
+    """
+    Estimate wn and zeta of a free decay from the logarithmic decrement of its peaks.
+
+    One peak is taken per positive half cycle of (data - offset), ignoring those at or
+    below min_height (the noise floor). Instead of keeping the peaks, ln(amplitude)
+    and peak time are regressed on the peak number with running sums, so the
+    decrement delta and the damped period Td use every peak in the recording.
+
+    Args:
+        data (array-like or iterable): Free decay samples.
+        dt (float): Sample time.
+        offset (float): Equilibrium position subtracted from the signal.
+        min_height (float): Ignore peaks at or below this amplitude.
+        chunk_size (int): Samples per chunk when data is an array.
+
+    Returns:
+        dict: wn, zeta, gain (1.0), numerator, denominator, wd, delta and n_peaks.
+    """
+    # Running sums for the two regressions on the peak number k
+    n = sk = skk = sla = skla = st = skt = 0.0
+    for t_peak, amp in _half_cycle_peaks(data, dt, offset, chunk_size):
+        if amp <= min_height:
+            continue
+        k = n
+        n += 1
+        sk += k
+        skk += k * k
+        sla += np.log(amp)
+        skla += k * np.log(amp)
+        st += t_peak
+        skt += k * t_peak
+
+    if n < 2:
+        raise ValueError("Need at least two peaks above min_height to estimate the decrement")
+    var_k = n * skk - sk**2
+    delta = -(n * skla - sk * sla) / var_k
+    Td = (n * skt - sk * st) / var_k
+    zeta = delta / np.sqrt(4 * np.pi**2 + delta**2)
+    wd = 2 * np.pi / Td
+    wn = wd / np.sqrt(1 - zeta**2)
+    return _result(wn, zeta, wd=wd, delta=delta, n_peaks=int(n))
+
+
+def welch_psd(data, dt: float, nperseg: int = 1 << 16, chunk_size: int = 1 << 20):
+    """
+    Streaming Welch power spectral density (Hann window, 50% overlap).
+
+    Returns:
+        tuple: (omega in rad/s, averaged PSD, number of segments).
+    """
+    window = np.hanning(nperseg)
+    step = nperseg // 2
+    psd = np.zeros(nperseg // 2 + 1)
+    n_segments = 0
+    carry = np.empty(0)
+    for chunk in _iter_chunks(data, chunk_size):
+        x = np.concatenate([carry, chunk])
+        n_full = (x.size - nperseg) // step + 1 if x.size >= nperseg else 0
+        if n_full > 0:
+            starts = np.arange(n_full) * step
+            segments = x[starts[:, None] + np.arange(nperseg)]
+            segments = segments - segments.mean(axis=1, keepdims=True)
+            psd += np.sum(np.abs(np.fft.rfft(segments * window, axis=1))**2, axis=0)
+            n_segments += n_full
+            carry = x[n_full * step:]
+        else:
+            carry = x
+    if n_segments == 0:
+        raise ValueError("Recording is shorter than one segment, lower nperseg")
+    psd *= dt / (np.sum(window**2) * n_segments)
+    omega = 2 * np.pi * np.fft.rfftfreq(nperseg, dt)
+    return omega, psd, n_segments
+
+
+def decay_periodogram(data, dt: float, nperseg: int = 1 << 16, chunk_size: int = 1 << 20, pad: int = 4):
+    """
+    Periodogram of the start of a free decay: the first nperseg samples, rectangular
+    window, zero-padded to pad * nperseg points.
+
+    Averaging Hann windowed segments (welch_psd) smears a decay, whose energy sits at
+    the start of the record, and biases the bandwidth. A single unwindowed segment
+    that covers the whole decay is its Fourier transform instead, so it has to be
+    long enough for the decay to die out.
+
+    Returns:
+        tuple: (omega in rad/s, periodogram, number of samples used).
+    """
+    head, n = [], 0
+    for chunk in _iter_chunks(data, chunk_size):
+        head.append(chunk[:nperseg - n])
+        n += head[-1].size
+        if n >= nperseg:
+            break
+    x = np.concatenate(head) if head else np.empty(0)
+    if x.size < 16:
+        raise ValueError("Recording is too short for a periodogram")
+    tail = np.max(np.abs(x[-max(x.size // 20, 1):]))
+    if tail > 0.05 * np.max(np.abs(x)):
+        raise ValueError("The decay has not died out within nperseg samples, raise nperseg")
+    nfft = pad * x.size
+    psd = np.abs(np.fft.rfft(x, nfft))**2 * dt / x.size
+    omega = 2 * np.pi * np.fft.rfftfreq(nfft, dt)
+    return omega, psd, x.size
+
+
+def half_power_bandwidth(data, dt: float, nperseg: int = 1 << 16, chunk_size: int = 1 << 20,
+                         signal: str = 'forced') -> dict:
+    """
+    Estimate wn and zeta from the half-power (-3 dB) points of the response spectrum.
+
+    w1, w2 are the frequencies on either side of the resonant peak where the spectrum
+    has dropped to half its peak value (linearly interpolated between bins).
+
+    Args:
+        data (array-like or iterable): Response samples.
+        dt (float): Sample time.
+        nperseg (int): Welch segment length, or the samples of the decay periodogram.
+            The frequency resolution is 2 pi/(nperseg dt), so nperseg has to resolve
+            the bandwidth for light damping.
+        chunk_size (int): Samples per chunk when data is an array.
+        signal (str): 'forced' for a stationary response to broadband forcing. Its
+            Welch PSD is |H|^2, which peaks at wn sqrt(1 - 2 zeta^2), and
+            zeta = (w2 - w1)/(2 wn). 'decay' for a free decay starting at the first
+            sample, analyzed with decay_periodogram. That spectrum peaks at wd with
+            half-power points wd -+ zeta wn, so wn = sqrt(wd^2 + ((w2 - w1)/2)^2).
+
+    Returns:
+        dict: wn, zeta, gain (1.0), numerator, denominator, peak_frequency and n_segments.
+    """
+    if signal not in ('forced', 'decay'):
+        raise ValueError("signal must be 'forced' or 'decay'")
+    if signal == 'decay':
+        omega, psd, _ = decay_periodogram(data, dt, nperseg, chunk_size)
+        n_segments = 1
+    else:
+        omega, psd, n_segments = welch_psd(data, dt, nperseg, chunk_size)
+    k = 1 + int(np.argmax(psd[1:]))  # skip the DC bin
+    half = psd[k] / 2
+    left = k
+    while left > 0 and psd[left] > half:
+        left -= 1
+    right = k
+    while right < psd.size - 1 and psd[right] > half:
+        right += 1
+    w1 = np.interp(half, [psd[left], psd[left + 1]], [omega[left], omega[left + 1]])
+    w2 = np.interp(half, [psd[right], psd[right - 1]], [omega[right], omega[right - 1]])
+    if signal == 'decay':
+        wn = np.hypot(omega[k], (w2 - w1) / 2)
+        zeta = (w2 - w1) / (2 * wn)
+    else:
+        zeta = (w2 - w1) / (2 * omega[k])
+        # The displacement PSD peaks at wn sqrt(1 - 2 zeta^2)
+        wn = omega[k] / np.sqrt(max(1 - 2 * zeta**2, 1e-12))
+        zeta = (w2 - w1) / (2 * wn)
+    return _result(wn, zeta, peak_frequency=omega[k], n_segments=n_segments)
+
+
+def decimate_stream(data, max_points: int = 100_000, chunk_size: int = 1 << 20):
+    """
+    Keep an evenly spaced subsample of at most max_points samples from a stream.
+
+    The stride doubles (and every other kept sample is dropped) whenever the buffer
+    fills, so the length of the stream does not need to be known up front.
+
+    Returns:
+        tuple: (sample indices, values).
+    """
+    stride = 1
+    idx = np.empty(0, dtype=np.int64)
+    val = np.empty(0)
+    position = 0
+    for chunk in _iter_chunks(data, chunk_size):
+        first = (-position) % stride
+        take = np.arange(first, chunk.size, stride)
+        idx = np.concatenate([idx, position + take])
+        val = np.concatenate([val, chunk[take]])
+        position += chunk.size
+        while idx.size > max_points:
+            stride *= 2
+            keep = idx % stride == 0
+            idx, val = idx[keep], val[keep]
+    return idx, val
+
+
+def fit_free_decay(data, dt: float, max_points: int = 100_000, initial: dict = None,
+                   chunk_size: int = 1 << 20) -> dict:
+    """
+    Least-squares fit of system_response.free_response to a free decay.
+
+    The stream is decimated to at most max_points samples for the fit. The starting
+    point comes from log_decrement on the decimated data (peaks below 1% of the
+    largest sample are treated as noise) unless `initial` gives wn, zeta, x0 and v0.
+
+    Returns:
+        dict: wn, zeta, gain (1.0), numerator, denominator, x0, v0 and cost.
+    """
+    from scipy.optimize import least_squares
+
+    idx, y = decimate_stream(data, max_points, chunk_size)
+    t = idx * dt
+    if initial is None:
+        t_step = (idx[1] - idx[0]) * dt if idx.size > 1 else dt
+        guess = log_decrement(y, t_step, min_height=0.01 * np.max(np.abs(y)))
+        initial = dict(wn=guess['wn'], zeta=guess['zeta'], x0=y[0],
+                       v0=(y[1] - y[0]) / t_step if y.size > 1 else 0.0)
+    p0 = [initial['wn'], initial['zeta'], initial['x0'], initial['v0']]
+
+    def residual(p):
+        return free_response(t, p[1], p[0], p[2], p[3]) - y
+
+    fit = least_squares(residual, p0, bounds=([1e-12, 0, -np.inf, -np.inf], np.inf))
+    wn, zeta, x0, v0 = fit.x
+    return _result(wn, zeta, x0=x0, v0=v0, cost=fit.cost)
+
+
+def fit_step_response(data, dt: float, input_amplitude: float = 1.0, max_points: int = 100_000,
+                      initial: dict = None, chunk_size: int = 1 << 20) -> dict:
+    """
+    Least-squares fit of a second order step response gain*wn^2/(s^2 + 2 zeta wn s + wn^2).
+
+    Uses analytic_response on a decimated copy of the stream. Without `initial`
+    (wn, zeta, gain) the gain is taken from the tail of the record and wn, zeta from
+    the log decrement of the oscillation about it, or from the 63% rise time if the
+    response does not oscillate.
+
+    Returns:
+        dict: wn, zeta, gain (DC gain of the plant), numerator, denominator and cost.
+    """
+    from scipy.optimize import least_squares
+
+    idx, y = decimate_stream(data, max_points, chunk_size)
+    t = idx * dt
+    y = y / input_amplitude
+    if initial is None:
+        gain = np.mean(y[-max(y.size // 20, 1):])
+        t_step = (idx[1] - idx[0]) * dt if idx.size > 1 else dt
+        try:
+            guess = log_decrement(y, t_step, offset=gain, min_height=0.01 * abs(gain))
+            initial = dict(wn=guess['wn'], zeta=guess['zeta'], gain=gain)
+        except ValueError:
+            t63 = t[np.argmax(np.abs(y) >= 0.63 * abs(gain))]
+            initial = dict(wn=2 / max(t63, t_step), zeta=1.0, gain=gain)
+    p0 = [initial['wn'], initial['zeta'], initial['gain']]
+
+    def residual(p):
+        wn, zeta, gain = p
+        return analytic_response([gain * wn**2], [1, 2 * zeta * wn, wn**2], t) - y
+
+    fit = least_squares(residual, p0, bounds=([1e-12, 0, -np.inf], np.inf))
+    wn, zeta, gain = fit.x
+    return _result(wn, zeta, gain, cost=fit.cost)
+
+
+if __name__ == "__main__":
+    # Synthetic accelerometer-like record: wn = 12 rad/s, zeta = 0.03, plus noise
+    dt = 1e-3
+    t = np.arange(200_000) * dt
+    rng = np.random.default_rng(0)
+    record = free_response(t, 0.03, 12.0, 1.0, 0.0) + 1e-4 * rng.standard_normal(t.size)
+
+    for name, estimate in (('log decrement', log_decrement(record, dt, min_height=1e-3)),
+                           ('half power', half_power_bandwidth(record, dt, signal='decay')),
+                           ('least squares', fit_free_decay(record, dt))):
+        print(f"{name:>14}: wn = {estimate['wn']:.4f} rad/s, zeta = {estimate['zeta']:.5f}")
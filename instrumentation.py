@@ -0,0 +1,150 @@
+import functools
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Opt-in hot path instrumentation: per stage wall time, call counts and (optionally)
+# memory allocated, for finding regressions in batch runs.
+#
+# Functions are marked with @instrumented(name) and code blocks with `with stage(name)`.
+# While disabled (the default) the decorator costs one global flag test per call and
+# stage() yields straight away, so the markers can stay in the hot paths.
+#
+#     import instrumentation
+#     instrumentation.enable(track_memory=True)
+#     analyze_transfer_function([49], [1, 7.392, 49])
+#     instrumentation.write_report('profile.json')
+#
+# Setting MSD_PROFILE=1 (or MSD_PROFILE=memory) in the environment enables it at import.
+
+_enabled = False
+_track_memory = False
+_started_tracing = False  # tracemalloc was started by enable(), not by the caller
+_stats = {}
+_stack = []   # open stages: [name, start, memory at entry, largest child peak]
+
+
+def enable(track_memory: bool = False):
+    """Start collecting. track_memory also traces allocations with tracemalloc (slower)."""
+    global _enabled, _track_memory, _started_tracing
+    _enabled = True
+    _track_memory = track_memory
+    if track_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _started_tracing = True
+
+
+def disable():
+    """
+    Stop collecting (the statistics gathered so far are kept). tracemalloc is only
+    stopped if enable() started it.
+    """
+    global _enabled, _started_tracing
+    _enabled = False
+    if _started_tracing and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _started_tracing = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset():
+    """Forget all statistics. Stages that are open are still recorded when they close."""
+    _stats.clear()
+
+
+def _enter(name: str):
+    memory = 0
+    if _track_memory:
+        memory, peak = tracemalloc.get_traced_memory()
+        # The enclosing stage's peak so far would be lost by reset_peak()
+        if _stack:
+            _stack[-1][3] = max(_stack[-1][3], peak)
+        tracemalloc.reset_peak()
+    _stack.append([name, time.perf_counter(), memory, 0])
+
+
+def _exit():
+    name, start, memory, child_peak = _stack.pop()
+    elapsed = time.perf_counter() - start
+    entry = _stats.get(name)
+    if entry is None:
+        entry = _stats[name] = dict(calls=0, total_s=0.0, min_s=float('inf'), max_s=0.0,
+                                    net_bytes=0, peak_bytes=0)
+    entry['calls'] += 1
+    entry['total_s'] += elapsed
+    entry['min_s'] = min(entry['min_s'], elapsed)
+    entry['max_s'] = max(entry['max_s'], elapsed)
+    if _track_memory:
+        current, peak = tracemalloc.get_traced_memory()
+        # reset_peak() in nested stages hides their peaks from this one, so children
+        # hand their absolute peak up the stack
+        peak = max(peak, child_peak)
+        entry['net_bytes'] += current - memory
+        entry['peak_bytes'] = max(entry['peak_bytes'], peak - memory)
+        if _stack:
+            _stack[-1][3] = max(_stack[-1][3], peak)
+
+
+@contextmanager
+def stage(name: str):
+    """Time the enclosed block as stage `name` (does nothing while disabled)."""
+    if not _enabled:
+        yield
+        return
+    _enter(name)
+    try:
+        yield
+    finally:
+        _exit()
+
+
+def instrumented(name: str = None):
+    """Decorator recording every call of the function as a stage (default: its qualified name)."""
+    def decorate(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            _enter(label)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _exit()
+        return wrapper
+    return decorate
+
+
+def report() -> dict:
+    """Statistics per stage, sorted by total time, as plain JSON-ready types."""
+    stages = {}
+    for name, entry in sorted(_stats.items(), key=lambda item: -item[1]['total_s']):
+        stages[name] = dict(entry, mean_s=entry['total_s'] / entry['calls'])
+        if not _track_memory:
+            del stages[name]['net_bytes'], stages[name]['peak_bytes']
+    return dict(enabled=_enabled, track_memory=_track_memory, stages=stages)
+
+
+def write_report(path: str):
+    """Write report() as JSON."""
+    with open(path, 'w') as f:
+        json.dump(report(), f, indent=2)
+
+
+def print_report():
+    """Human readable table of report()."""
+    stages = report()['stages']
+    print(f"{'stage':<44}{'calls':>8}{'total ms':>12}{'mean ms':>12}{'peak KiB':>12}")
+    for name, entry in stages.items():
+        peak = f"{entry['peak_bytes'] / 1024:12.1f}" if 'peak_bytes' in entry else f"{'-':>12}"
+        print(f"{name:<44}{entry['calls']:>8}{entry['total_s'] * 1e3:12.3f}{entry['mean_s'] * 1e3:12.3f}{peak}")
+
+
+if os.environ.get('MSD_PROFILE'):
+    enable(track_memory=os.environ['MSD_PROFILE'].lower() == 'memory')
@@ -0,0 +1,190 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from system_identifier import SETTLING_BANDS
+from system_response import free_response
+
+# Inverse design of the mass-spring-damper: the damping c and stiffness k that give a
+# required step response, for a given mass. The forward formulas in
+# ParameterCalculation
+#     PO = 100 e^(-zeta pi / sqrt(1 - zeta^2)),  Tp = pi / (wn sqrt(1 - zeta^2)),
+#     Ts = n / (zeta wn)   (n = 5, 4, 3, 2 for the 1, 2, 5, 10% bands)
+# invert in closed form for any two of PO, Ts, Tp, zeta and wn, and then
+#     c = 2 zeta wn m,  k = wn^2 m.
+# With settling='exact' Ts is the true time the step response stays inside the band
+# instead of the n / (zeta wn) envelope estimate. That has no closed form, so it is
+# found by bisection, run on whole arrays of specs at once.
+
+SETTLING_FACTORS = dict(zip(SETTLING_BANDS, (5, 4, 3, 2)))
+BISECTION_STEPS = 60
+
+
+class Design(NamedTuple):
+    c: np.ndarray
+    k: np.ndarray
+    zeta: np.ndarray
+    wn: np.ndarray
+
+
+def zeta_from_overshoot(PO) -> np.ndarray:
+    """
+    Damping ratio giving a percent overshoot PO (inverse of the PO formula).
+
+    PO <= 0 gives zeta = 1, the fastest response without overshoot.
+    """
+    PO = np.asarray(PO, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_po = np.log(np.clip(PO, 0, 100) / 100)
+        zeta = -log_po / np.sqrt(np.pi**2 + log_po**2)
+    zeta = np.where(PO <= 0, 1.0, zeta)
+    return np.where(np.isnan(PO), np.nan, zeta)
+
+
+def _bisect(f, lo, hi, steps: int = BISECTION_STEPS):
+    """
+    Elementwise bisection for a sign change of f between lo (f > 0) and hi (f <= 0).
+
+    Returns the final hi, so a sign change at a jump of f gives the f <= 0 side.
+    """
+    for _ in range(steps):
+        mid = 0.5 * (lo + hi)
+        above = f(mid) > 0
+        lo = np.where(above, mid, lo)
+        hi = np.where(above, hi, mid)
+    return hi
+
+
+def normalized_settling_time(zeta, band: float = 0.02) -> np.ndarray:
+    """
+    Exact wn Ts: the last time |y - 1| = band in the unit step response with wn = 1.
+
+    For zeta < 1 the extrema of y - 1 are at t_j = j pi / wd with size (PO/100)^j, so
+    the crossing lies between the last extremum outside the band and the next one,
+    where |y - 1| has a single crossing of the band. For zeta >= 1 the response is
+    monotonic and the bracket is [0, t] with t grown until the response is settled.
+    """
+    zeta = np.asarray(zeta, dtype=float)
+
+    def outside(t):
+        return np.abs(free_response(t, zeta, 1.0, 1.0, 0.0)) - band
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        wd = np.sqrt(np.maximum(1 - zeta**2, 0))
+        under = zeta < 1
+        last = np.ceil(np.log(1 / band) * wd / (zeta * np.pi)) - 1
+        last = np.where(under, np.maximum(last, 0), 0)
+        lo = np.where(under, last * np.pi / wd, 0.0)
+        # slowest pole of the overdamped response is zeta - sqrt(zeta^2 - 1)
+        slow = zeta - np.sqrt(np.maximum(zeta**2 - 1, 0))
+        hi = np.where(under, (last + 1) * np.pi / wd, 2 * (np.log(1 / band) + 2) / slow)
+    hi = np.where(np.isfinite(hi), hi, np.nan)
+    for _ in range(8):
+        unsettled = ~under & (outside(hi) > 0)
+        if not unsettled.any():
+            break
+        hi = np.where(unsettled, 2 * hi, hi)
+    ts = _bisect(outside, lo, hi)
+    return np.where(zeta > 0, ts, np.inf)
+
+
+def design_second_order(m, PO=None, Ts=None, Tp=None, zeta=None, wn=None, band: float = 0.02,
+                        settling: str = 'envelope') -> Design:
+    """
+    c and k of m x'' + c x' + k x = f(t) meeting two step response specs.
+
+    Exactly two of PO, Ts, Tp, zeta and wn must be given, and not both of PO and zeta.
+    Every argument may be an array, and everything broadcasts, so thousands of specs
+    are solved in one call. Specs that no underdamped system meets (e.g. a Tp together
+    with PO = 0) give NaN.
+
+    Args:
+        m (float or array-like): Mass.
+        PO (float or array-like): Percent overshoot.
+        Ts (float or array-like): Settling time for the given band.
+        Tp (float or array-like): Peak time.
+        zeta, wn (float or array-like): Damping ratio and natural frequency directly.
+        band (float): Settling band, one of 0.01, 0.02, 0.05, 0.10.
+        settling (str): 'envelope' uses Ts = n / (zeta wn) like ParameterCalculation,
+            'exact' the true settling time of the step response (found by bisection).
+            The exact settling time drops by up to half a period whenever another
+            peak enters the band, so Ts with Tp can only be met at some values. The
+            design at the drop is returned then, which settles faster than Ts.
+
+    Returns:
+        Design: (c, k, zeta, wn) arrays.
+
+    Example:
+        design_second_order(61.48, PO=np.linspace(1, 30, 1000), Ts=0.5).k
+    """
+    if band not in SETTLING_FACTORS:
+        raise ValueError(f"band must be one of {tuple(SETTLING_FACTORS)}")
+    if settling not in ('envelope', 'exact'):
+        raise ValueError("settling must be 'envelope' or 'exact'")
+    given = {name for name, value in dict(PO=PO, Ts=Ts, Tp=Tp, zeta=zeta, wn=wn).items() if value is not None}
+    if len(given) != 2 or given == {'PO', 'zeta'}:
+        raise ValueError(f"Give exactly two of PO, Ts, Tp, zeta and wn (not PO with zeta), got {sorted(given)}")
+    if settling == 'exact' and given == {'Ts', 'wn'}:
+        raise ValueError("Ts with wn is only supported with settling='envelope'")
+    n = SETTLING_FACTORS[band]
+    as_array = (lambda value: None if value is None else np.asarray(value, dtype=float))
+    m, PO, Ts, Tp, zeta, wn = (as_array(value) for value in (m, PO, Ts, Tp, zeta, wn))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if PO is not None:
+            zeta = zeta_from_overshoot(PO)
+        if zeta is not None and wn is None:
+            if Ts is not None:
+                scale = normalized_settling_time(zeta, band) if settling == 'exact' else n / zeta
+                wn = scale / Ts
+            else:
+                wn = np.pi / (Tp * np.sqrt(1 - zeta**2))
+        elif wn is not None and zeta is None:
+            zeta = n / (wn * Ts) if Ts is not None else np.sqrt(1 - (np.pi / (wn * Tp))**2)
+        elif zeta is None:
+            # Ts and Tp: Tp fixes the damped frequency, Ts the decay rate
+            wd = np.pi / Tp
+            if settling == 'envelope':
+                sigma = n / Ts
+                wn = np.hypot(sigma, wd)
+                zeta = sigma / wn
+            else:
+                # Ts(zeta) = wn Ts / wn falls from infinity at zeta = 0 to 0 at zeta = 1
+                Ts, wd = np.broadcast_arrays(Ts, wd)
+                zeta = _bisect(lambda z: normalized_settling_time(z, band) * np.sqrt(1 - z**2) / wd - Ts,
+                               np.zeros(Ts.shape), np.ones(Ts.shape))
+                wn = wd / np.sqrt(1 - zeta**2)
+        zeta, wn = np.broadcast_arrays(zeta, wn)
+        ok = np.isfinite(zeta) & np.isfinite(wn) & (zeta >= 0) & (wn > 0)
+        zeta = np.where(ok, zeta, np.nan)
+        wn = np.where(ok, wn, np.nan)
+    return Design(c=2 * zeta * wn * m, k=wn**2 * m, zeta=zeta, wn=wn)
+
+
+if __name__ == "__main__":
+    import time
+
+    from system_identifier import BatchParameterCalculation, numeric_step_metrics
+
+    # HW10_P1_Dominant_Poles.m: poles -1 ± 5j mean Tp = pi/5 and a 2% Ts of 4 s
+    design = design_second_order(1.0, Ts=4.0, Tp=np.pi / 5)
+    print(f"Ts = 4 s, Tp = pi/5 s: c = {design.c:.4g}, k = {design.k:.4g} (expected 2 and 26)")
+
+    # 10^6 (PO, Ts) specs for the vibrations_functions.py mass
+    rng = np.random.default_rng(0)
+    PO = rng.uniform(1, 40, 1_000_000)
+    Ts = rng.uniform(0.2, 2.0, 1_000_000)
+    start = time.perf_counter()
+    design = design_second_order(61.48, PO=PO, Ts=Ts)
+    elapsed = time.perf_counter() - start
+    check = BatchParameterCalculation(design.k[:, None], np.column_stack([np.full(PO.size, 61.48), design.c, design.k]))
+    print(f"10^6 closed form designs in {elapsed:.3f} s, max PO error {np.max(np.abs(check.PO - PO)):.1e} %, "
+          f"max Ts error {np.max(np.abs(check.Ts_1 - Ts)):.1e} s")
+
+    start = time.perf_counter()
+    exact = design_second_order(61.48, PO=PO[:10_000], Ts=Ts[:10_000], settling='exact')
+    elapsed = time.perf_counter() - start
+    metrics = [numeric_step_metrics([exact.k[i]], [61.48, exact.c[i], exact.k[i]]) for i in range(20)]
+    error = max(abs(metric['Ts_1'] - Ts[i]) for i, metric in enumerate(metrics))
+    print(f"10^4 exact settling time designs in {elapsed:.3f} s, max Ts error against "
+          f"numeric_step_metrics {error:.1e} s")
@@ -0,0 +1,173 @@
+import hashlib
+import importlib.util
+import os
+from math import factorial
+
+import numpy as np
+
+# Partial fractions and inverse Laplace transforms of rational Y(s) = G(s) U(s),
+# the Python version of HW08_P1_Three_cases_PFE_iLT.m.
+#
+# Two routes give the same vectorized y(t):
+#   - numeric: residue() -> sum of r t^(n-1)/(n-1)! e^(p t) terms, no SymPy at all
+#   - symbolic: sp.apart + sp.inverse_laplace_transform for an exact closed form.
+#     The derivation is cached on a hash of the expression, in memory and as a small
+#     generated numpy module on disk, so later runs import that module and never
+#     touch SymPy.
+
+INPUT_TRANSFORMS = {
+    'impulse': ([1.0], [1.0]),
+    'step': ([1.0], [1.0, 0.0]),
+    'ramp': ([1.0], [1.0, 0.0, 0.0]),
+}
+
+# Part of the cache key, bump it whenever _derive changes the generated code so modules
+# written by an older version are not served
+GENERATOR_VERSION = 2
+CACHE_DIR = os.environ.get('MSD_ILT_CACHE',
+                           os.path.join(os.path.expanduser('~'), '.cache', 'mass_spring_damper', 'ilt'))
+
+_compiled = {}
+
+
+def partial_fractions(numerator, denominator, input_type='step', tol: float = 1e-3):
+    """
+    Partial fraction expansion of Y(s) = G(s) U(s).
+
+    Args:
+        numerator, denominator (array-like): G(s) coefficients, descending powers of s.
+        input_type (str or tuple): 'impulse', 'step', 'ramp' or a (num, den) pair for U(s).
+        tol (float): Poles closer than this are treated as one repeated pole.
+
+    Returns:
+        tuple: (residues, poles, powers, direct) with
+            Y(s) = sum r_i / (s - p_i)^n_i + polyval(direct, s), as residue() in MATLAB.
+    """
+    from scipy.signal import residue
+
+    u_num, u_den = INPUT_TRANSFORMS[input_type] if isinstance(input_type, str) else input_type
+    num = np.polymul(np.atleast_1d(np.asarray(numerator, dtype=float)), u_num)
+    den = np.polymul(np.atleast_1d(np.asarray(denominator, dtype=float)), u_den)
+    r, p, k = residue(num, den, tol=tol)
+    # residue() lists a repeated pole once per power, in increasing powers
+    powers = np.ones(p.size, dtype=int)
+    for i in range(1, p.size):
+        if abs(p[i] - p[i - 1]) <= tol * max(1.0, abs(p[i])):
+            powers[i] = powers[i - 1] + 1
+    return r, p, powers, k
+
+
+class TimeFunction:
+    """
+    Vectorized y(t) = sum r_i t^(n_i-1)/(n_i-1)! e^(p_i t) for t >= 0 (0 before).
+
+    Impulsive terms from a non-strictly-proper Y(s) (the direct part) only act at
+    t = 0 and are left out.
+
+    Example:
+        y = TimeFunction(*partial_fractions([26], [1, 3, 28, 26], 'step')[:3])
+        y(np.linspace(0, 5, 1000))
+    """
+
+    def __init__(self, residues, poles, powers):
+        self.residues = np.asarray(residues, dtype=complex)
+        self.poles = np.asarray(poles, dtype=complex)
+        self.powers = np.asarray(powers, dtype=int)
+        self._scale = self.residues / np.array([factorial(n - 1) for n in self.powers])
+
+    def __call__(self, t) -> np.ndarray:
+        t = np.asarray(t, dtype=float)
+        tt = np.maximum(t, 0)[..., None]
+        terms = self._scale * tt**(self.powers - 1) * np.exp(self.poles * tt)
+        return np.where(t >= 0, terms.sum(axis=-1).real, 0.0)
+
+
+def inverse_laplace(numerator, denominator, input_type='step') -> TimeFunction:
+    """Numeric inverse Laplace transform of G(s) U(s) as a vectorized TimeFunction."""
+    return TimeFunction(*partial_fractions(numerator, denominator, input_type)[:3])
+
+
+def _cache_key(expression: str) -> str:
+    key = f"{GENERATOR_VERSION}:{''.join(expression.split())}"
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def _derive(expression: str) -> str:
+    """Return numpy source of y(t) for the Laplace domain expression (the SymPy step)."""
+    import sympy as sp
+    from sympy.printing.numpy import NumPyPrinter
+
+    s = sp.Symbol('s')
+    t = sp.Symbol('t', positive=True)
+    F = sp.sympify(expression, locals={'s': s})
+    f = sp.inverse_laplace_transform(sp.apart(sp.together(F), s), s, t)
+    # Keep one coefficient * e^(p t) term per pole. simplify() would factor out e.g.
+    # e^(-7 t) (2 e^(5 t) - ...), which gives inf * 0 = nan for large t
+    f = sp.powsimp(sp.expand(f, power_exp=False))
+    body = NumPyPrinter().doprint(f)
+    return ("import numpy\n\n"
+            f"EXPRESSION = {expression!r}\n"
+            f"TIME_DOMAIN = {str(f)!r}\n\n\n"
+            "def f(t):\n"
+            f"    return {body}\n")
+
+
+def symbolic_inverse_laplace(expression: str, cache_dir: str = None):
+    """
+    Exact inverse Laplace transform of an expression in s, compiled to numpy.
+
+    Args:
+        expression (str): Y(s) in SymPy syntax, e.g. '1/((s+2)*(s+5)*(s+7))'.
+        cache_dir (str): Where the generated modules live, defaults to CACHE_DIR
+            (set MSD_ILT_CACHE to move it).
+
+    Returns:
+        callable: y(t) for an array of t, 0 for t < 0. Its `time_domain` attribute
+            holds the closed form as text.
+    """
+    key = _cache_key(expression)
+    if key in _compiled:
+        return _compiled[key]
+
+    cache_dir = cache_dir or CACHE_DIR
+    path = os.path.join(cache_dir, f"ilt_{key}.py")
+    if not os.path.exists(path):
+        source = _derive(expression)
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as fh:
+            fh.write(source)
+        os.replace(tmp, path)  # atomic, so concurrent runs never see half a file
+
+    spec = importlib.util.spec_from_file_location(f"ilt_{key}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    def y(t):
+        t = np.asarray(t, dtype=float)
+        values = np.broadcast_to(np.real(module.f(np.maximum(t, 0))), t.shape)
+        return np.where(t >= 0, values, 0.0)
+
+    y.time_domain = module.TIME_DOMAIN
+    _compiled[key] = y
+    return y
+
+
+if __name__ == "__main__":
+    import time
+
+    # The three HW08 P1 cases: distinct, repeated and complex poles
+    cases = [([1], [1, 14, 59, 70], '1/(s**3 + 14*s**2 + 59*s + 70)'),
+             ([1], [1, 11, 45, 81, 54], '1/(s**4 + 11*s**3 + 45*s**2 + 81*s + 54)'),
+             ([1], [1, 5, 11, 15], '1/(s**3 + 5*s**2 + 11*s + 15)')]
+    t = np.linspace(0, 5, 1001)
+    for num, den, expression in cases:
+        r, p, n, _ = partial_fractions(num, den, 'impulse')
+        start = time.perf_counter()
+        exact = symbolic_inverse_laplace(expression)
+        elapsed = time.perf_counter() - start
+        numeric = inverse_laplace(num, den, 'impulse')
+        print(f"f(t) = {exact.time_domain}")
+        print(f"  residues {np.round(r.real, 4)} at poles {np.round(p, 4)} (powers {n})")
+        print(f"  max |numeric - exact| = {np.max(np.abs(numeric(t) - exact(t))):.1e}, "
+              f"symbolic step {elapsed * 1e3:.1f} ms")
@@ -0,0 +1,227 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from poles import batch_roots
+from system_identifier import SETTLING_BANDS, BatchParameterCalculation, ResultTable
+
+# Dominant pole reduction of higher order plants, the step HW10_P1_Dominant_Poles.m
+# does by eye: keep the slowest pole (or complex pair), scale it to the DC gain of the
+# full plant and analyze that first/second order model with the closed form formulas.
+#
+# The step responses of the full and the reduced plant are
+#     y(t) = K + sum a_i e^(p_i t),  a_i = N(p_i) / (p_i D'(p_i))
+# so with every Re(p_i) < 0 their difference is the decaying signal
+#     e(t) = y(t) - y_r(t) = sum c_i e^(p_i t),
+# c_i = a_i - a_r,i for the dominant poles and a_i for the rest. error_bound is an upper
+# bound of sup |e(t)| over t >= 0 divided by |K|, i.e. the largest step response error as
+# a fraction of the final value. _error_sup gets it from e(t) on a grid plus a curvature
+# margin, within a few percent of the true sup, so a whole fleet is reduced and checked
+# without simulating anything, and only the plants whose bound is too large need
+# numeric_step_metrics.
+
+
+class ReducedModel(NamedTuple):
+    numerator: np.ndarray    # (N, 1) gain of the reduced model
+    denominator: np.ndarray  # (N, 3), [0, 1, a] for a first order model
+    order: np.ndarray        # (N,) 1 or 2
+    dc_gain: np.ndarray      # (N,) shared by the full and the reduced model
+    error_bound: np.ndarray  # (N,) >= max |y - y_r| / |K| over t >= 0, inf if unknown
+
+
+# Grid sizes of _error_sup, each used only for rows the previous one left loose
+_ERROR_POINTS = (40, 160, 640)
+_ERROR_CHUNK = 2048
+
+
+def _polyval_rows(coefficients: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """Evaluate row i of coefficients at every x[i, :] (Horner)."""
+    result = np.zeros_like(x)
+    for j in range(coefficients.shape[1]):
+        result = result * x + coefficients[:, j:j + 1]
+    return result
+
+
+def _sampled_error(coefficients: np.ndarray, poles: np.ndarray, decay: np.ndarray, points: int):
+    """Largest sampled |e(t_k)| and upper bound of sup |e| for every row, see _error_sup."""
+    end = 10.0 / decay
+    start = 0.01 / np.max(np.abs(poles), axis=1)
+    t = np.sort(np.concatenate([end[:, None] * np.linspace(0.0, 1.0, points + 1),
+                                start[:, None] * (end / start)[:, None]**np.linspace(0.0, 1.0, points)],
+                               axis=1), axis=1)
+    e = np.zeros_like(t)
+    curvature = np.zeros_like(t)
+    tail = np.zeros_like(end)
+    for c, p in zip(coefficients.T, poles.T):
+        # Re(c e^(p t)) = |c| e^(Re(p) t) cos(Im(p) t + arg c), cheaper than a complex exp,
+        # and the cos is only needed when the column holds a complex pole
+        envelope = np.abs(c)[:, None] * np.exp(p.real[:, None] * t)
+        if np.any(p.imag != 0):
+            e += envelope * np.cos(p.imag[:, None] * t + np.angle(c)[:, None])
+        else:
+            e += envelope * np.sign(c.real)[:, None]
+        curvature += np.abs(p)[:, None]**2 * envelope
+        tail += envelope[:, -1]
+    e = np.abs(e)
+    between = np.maximum(e[:, :-1], e[:, 1:]) + curvature[:, :-1] * np.diff(t, axis=1)**2 / 8
+    return e.max(axis=1), np.maximum(between.max(axis=1), tail)
+
+
+def _error_sup(coefficients: np.ndarray, poles: np.ndarray, points=_ERROR_POINTS,
+               chunk_size=_ERROR_CHUNK, rtol=0.05) -> np.ndarray:
+    """
+    Upper bound of sup over t >= 0 of |e(t)| = |sum c_i e^(p_i t)| for every row, all Re(p_i) < 0.
+
+    e(t) is sampled on a linear grid up to T = 10 / the slowest decay rate, for the
+    oscillation, merged with a geometric one from 0.01 / the fastest |p_i|, for the fast
+    terms. Between two samples |e| exceeds the larger of them by at most dt^2 / 8 sup |e''|,
+    with |e''| <= sum |c_i| |p_i|^2 e^(Re(p_i) t_k), and after T it is at most
+    sum |c_i| e^(Re(p_i) T). The largest sample is a lower bound of the sup, so rows whose
+    bound is more than rtol above it are sampled again on the next, finer grid.
+    """
+    # One pole of each conjugate pair, counted twice, then the real ones, then the zero terms
+    weight = np.where(coefficients == 0, 0.0, np.where(poles.imag > 0, 2.0, np.where(poles.imag == 0, 1.0, 0.0)))
+    order = np.argsort(3 - weight % 3, axis=1, kind='stable')
+    weight = np.take_along_axis(weight, order, axis=1)
+    coefficients = np.take_along_axis(coefficients, order, axis=1) * weight
+    poles = np.take_along_axis(poles, order, axis=1)
+    decay = np.min(np.where(weight > 0, -poles.real, np.inf), axis=1)
+    columns = max(int(np.max(np.sum(weight > 0, axis=1), initial=0)), 1)
+    bound = np.empty(poles.shape[0])
+    loose = np.arange(poles.shape[0])
+    for level in points:
+        for start in range(0, loose.size, chunk_size):
+            rows = loose[start:start + chunk_size]
+            sampled, bound[rows] = _sampled_error(coefficients[rows, :columns], poles[rows, :columns],
+                                                  decay[rows], level)
+            loose[start:start + chunk_size] = np.where(bound[rows] > (1 + rtol) * sampled, rows, -1)
+        loose = loose[loose >= 0]
+    return bound
+
+
+def dominant_pole_reduction(numerators, denominators) -> ReducedModel:
+    """
+    First or second order models of a stack of plants from their slowest poles.
+
+    Args:
+        numerators (array-like): (N, m) or (m,) coefficients, descending powers of s.
+        denominators (array-like): (N, d+1) or (d+1,) coefficients, descending powers
+            of s. Rows may start with zeros.
+
+    Returns:
+        ReducedModel: Every plant's reduced model and error bound. Unstable plants and
+            plants with a pole at 0 get an infinite bound. So do plants with a repeated
+            pole, e.g. the critically damped 1 / (s + 1)^2: their step response has
+            t e^(p t) terms, D'(p) = 0 and the residues above do not exist. Use
+            numeric_step_metrics for those.
+
+    Example:
+        reduced = dominant_pole_reduction([[26], [104], [41]],
+                                          [[1, 3, 28, 26], [1, 6, 34, 104], [1, 9, 49, 41]])
+    """
+    num = np.atleast_2d(np.asarray(numerators, dtype=float))
+    den = np.atleast_2d(np.asarray(denominators, dtype=float))
+    n = den.shape[0]
+    poles = batch_roots(den)
+    present = ~np.isnan(poles)
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        # Leading zeros of a lower degree row cancel in both ratios
+        lead = den[np.arange(n), np.argmax(den != 0, axis=1)]
+        dc_gain = num[:, -1] / den[:, -1]
+        rows = np.arange(n)
+        dominant = poles[rows, np.argmax(np.where(present, poles.real, -np.inf), axis=1)]
+        scale = np.maximum(np.abs(dominant), 1.0)
+        pair = np.abs(dominant.imag) > 1e-9 * scale
+        # Pair members share a real part, batch_roots sorts the negative imaginary one
+        # first, so both are found by their distance to p and conj(p)
+        kept = (np.isclose(poles, dominant[:, None], rtol=0, atol=1e-9 * scale[:, None]) |
+                (pair[:, None] & np.isclose(poles, np.conj(dominant)[:, None], rtol=0,
+                                            atol=1e-9 * scale[:, None])))
+
+        wn2 = np.abs(dominant)**2
+        denominator = np.where(pair[:, None], np.column_stack([np.ones(n), -2 * dominant.real, wn2]),
+                               np.column_stack([np.zeros(n), np.ones(n), -dominant.real]))
+        gain = np.where(pair, wn2, -dominant.real)
+        numerator = (dc_gain * gain)[:, None]
+
+        # Step response coefficients of the full plant ...
+        dden = den[:, :-1] * np.arange(den.shape[1] - 1, 0, -1)
+        full = _polyval_rows(num / lead[:, None], poles) / (_polyval_rows(dden / lead[:, None], poles) * poles)
+        # ... and of the reduced one: -K for a real pole, K wn^2 / (p (p - conj p)) for a pair
+        reduced = np.where(pair[:, None], dc_gain[:, None] * wn2[:, None] / (poles * (poles - np.conj(poles))),
+                           -dc_gain[:, None])
+        error = np.where(kept, full - reduced, full)
+        error_bound = _error_sup(np.where(present, error, 0.0), np.where(present, poles, -1.0)) / np.abs(dc_gain)
+
+    stable = np.all(np.where(present, poles.real < 0, True), axis=1) & present.any(axis=1)
+    # A double root comes out of batch_roots split by about sqrt(eps) |p|
+    gap = np.abs(poles[:, :, None] - poles[:, None, :]) <= 1e-6 * np.maximum(np.abs(poles), 1.0)[:, :, None]
+    repeated = np.sum(gap & present[:, :, None] & present[:, None, :], axis=(1, 2)) > present.sum(axis=1)
+    error_bound = np.where(stable & ~repeated & np.isfinite(error_bound), error_bound, np.inf)
+    return ReducedModel(numerator, denominator.real, np.where(pair, 2, 1), dc_gain, error_bound)
+
+
+def reduced_metrics(reduced: ReducedModel, input_value=1.0) -> ResultTable:
+    """
+    Step response metrics of the reduced models as a ResultTable.
+
+    Second order models use the BatchParameterCalculation formulas. First order ones
+    get the exact rise time tau ln 9 and settling times tau ln(1 / band) and no
+    overshoot.
+    """
+    table = BatchParameterCalculation(reduced.numerator, reduced.denominator, input_value).to_table()
+    records = table.records
+    first = reduced.order == 1
+    tau = records['tau'][first]
+    records['Tr'][first] = tau * np.log(9)
+    records['PO'][first] = 0.0
+    for i, band in enumerate(SETTLING_BANDS):
+        records[f'Ts_{i}'][first] = tau * np.log(1 / band)
+    # Second order models with real poles (zeta >= 1) do not overshoot either
+    records['PO'] = np.where(records['valid'] & (records['zeta'] >= 1), 0.0, records['PO'])
+    return table
+
+
+if __name__ == "__main__":
+    import time
+
+    from system_identifier import numeric_step_metrics
+
+    # HW10_program.py Problem 1: the dominant pair is clear for 1B, not for 1A and 1C
+    reduced = dominant_pole_reduction([[26], [104], [41]], [[1, 3, 28, 26], [1, 6, 34, 104], [1, 9, 49, 41]])
+    table = reduced_metrics(reduced)
+    for name, i in zip('ABC', range(3)):
+        full = numeric_step_metrics([[26], [104], [41]][i], [[1, 3, 28, 26], [1, 6, 34, 104], [1, 9, 49, 41]][i])
+        print(f"1{name}: reduced to order {reduced.order[i]}, error bound {reduced.error_bound[i]:.3f}; "
+              f"Ts 2% {table['Ts_1'][i]:.3f} s (full {full['Ts_1']:.3f} s), "
+              f"PO {table['PO'][i]:.2f}% (full {full['PO']:.2f}%)")
+
+    # 10^5 plants of order 3 to 6: a dominant pair plus real poles 5-100x further out
+    rng = np.random.default_rng(0)
+    n_plants = 100_000
+    wn = rng.uniform(1, 10, n_plants)
+    zeta = rng.uniform(0.2, 0.8, n_plants)
+    dens = np.zeros((n_plants, 7))
+    for i in range(n_plants):
+        extra = -zeta[i] * wn[i] * rng.uniform(5, 100, rng.integers(1, 5))
+        den = np.polymul([1, 2 * zeta[i] * wn[i], wn[i]**2], np.poly(extra))
+        dens[i, 7 - den.size:] = den
+    nums = dens[:, -1:].copy()
+
+    start = time.perf_counter()
+    reduced = dominant_pole_reduction(nums, dens)
+    table = reduced_metrics(reduced)
+    t_reduced = time.perf_counter() - start
+    accepted = reduced.error_bound <= 0.05
+
+    n_full = 200
+    start = time.perf_counter()
+    full = [numeric_step_metrics(nums[i], np.trim_zeros(dens[i], 'f')) for i in range(n_full)]
+    t_full = (time.perf_counter() - start) * n_plants / n_full
+    po_error = np.array([abs(table['PO'][i] - f['PO']) for i, f in enumerate(full)])
+    tp_error = np.array([abs(table['Tp'][i] - f['Tp']) / f['Tp'] for i, f in enumerate(full)])
+    ok = accepted[:n_full]
+    print(f"{n_plants} plants: reduction {t_reduced:.2f} s, numeric_step_metrics ~{t_full:.0f} s; "
+          f"{accepted.mean():.0%} within a 5% bound, for those PO is within {np.max(po_error[ok]):.2f} "
+          f"points and Tp within {np.max(tp_error[ok]):.1%} of the numeric values")
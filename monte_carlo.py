@@ -0,0 +1,241 @@
+import os
+from dataclasses import dataclass
+from multiprocessing import Pool
+from typing import Dict, Sequence
+
+import numpy as np
+
+from system_identifier import BatchParameterCalculation
+
+# Monte Carlo propagation of manufacturing tolerances on m, c and k to the step
+# response metrics (overshoot, peak and settling time).
+#
+# Samples are drawn and evaluated chunk by chunk (BatchParameterCalculation on the
+# whole chunk), in worker processes when there are several chunks. Each chunk gets its
+# own child of one SeedSequence and the summaries are merged in chunk order (the
+# floating point mean/variance merge is not associative), so the result only depends on
+# the seed and chunk size, never on the number of workers. Nothing but fixed size
+# StreamingQuantiles summaries is kept, so 10^8 samples need no more memory than 10^4.
+
+
+@dataclass
+class Normal:
+    mean: float
+    std: float
+
+    def sample(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        return rng.normal(self.mean, self.std, n)
+
+
+@dataclass
+class Uniform:
+    low: float
+    high: float
+
+    def sample(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        return rng.uniform(self.low, self.high, n)
+
+
+@dataclass
+class LogNormal:
+    """Multiplicative scatter: median * exp(N(0, sigma)), never negative."""
+    median: float
+    sigma: float
+
+    def sample(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        return self.median * np.exp(rng.normal(0.0, self.sigma, n))
+
+
+@dataclass
+class Constant:
+    value: float
+
+    def sample(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        return np.full(n, float(self.value))
+
+
+def tolerance(nominal: float, percent: float, kind: str = 'normal'):
+    """
+    Distribution for a part specified as nominal ± percent.
+
+    'normal' treats the tolerance band as ±3 sigma, 'uniform' spreads the samples
+    evenly over the band.
+    """
+    half_width = abs(nominal) * percent / 100
+    if kind == 'normal':
+        return Normal(nominal, half_width / 3)
+    if kind == 'uniform':
+        return Uniform(nominal - half_width, nominal + half_width)
+    raise ValueError("kind must be 'normal' or 'uniform'")
+
+
+class StreamingQuantiles:
+    """
+    Mergeable streaming summary of a positive quantity: count, mean, std, min, max and
+    any quantile.
+
+    Values are counted into log spaced bins between lo and hi, so quantiles come out
+    with a relative error below one bin width (0.12% with the defaults) however many
+    values were added, and two summaries merge exactly by adding their counts. The
+    mean and variance are accumulated exactly with the pairwise (Chan) update. Values
+    below lo (including 0) or above hi are counted and reported as the observed min/max.
+    """
+
+    def __init__(self, lo: float = 1e-6, hi: float = 1e6, bins: int = 24_000):
+        self.edges = np.geomspace(lo, hi, bins + 1)
+        self._log_lo, self._log_hi = np.log(lo), np.log(hi)
+        self.counts = np.zeros(bins + 2, dtype=np.int64)  # [below, bins..., above]
+        self.count = 0
+        self.nan_count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values: np.ndarray):
+        values = np.asarray(values, dtype=float).ravel()
+        finite = np.isfinite(values)
+        self.nan_count += int(values.size - finite.sum())
+        values = values[finite]
+        if values.size == 0:
+            return
+        bins = self.counts.size - 2
+        with np.errstate(divide='ignore'):
+            position = (np.log(values) - self._log_lo) / (self._log_hi - self._log_lo) * bins
+        index = np.clip(np.floor(position), -1, bins).astype(np.int64) + 1
+        self.counts += np.bincount(index, minlength=self.counts.size)
+        self._combine(values.size, values.mean(), np.sum((values - values.mean())**2))
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+
+    def _combine(self, n: int, mean: float, m2: float):
+        total = self.count + n
+        delta = mean - self.mean
+        self._m2 += m2 + delta**2 * self.count * n / total
+        self.mean += delta * n / total
+        self.count = total
+
+    def merge(self, other: 'StreamingQuantiles') -> 'StreamingQuantiles':
+        """Add another summary with the same bins into this one (in place)."""
+        self.counts += other.counts
+        self.nan_count += other.nan_count
+        if other.count:
+            self._combine(other.count, other.mean, other._m2)
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def std(self) -> float:
+        return np.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else np.nan
+
+    def quantiles(self, q) -> np.ndarray:
+        """Quantiles q in [0, 1], interpolated geometrically inside a bin."""
+        q = np.atleast_1d(np.asarray(q, dtype=float))
+        if self.count == 0:
+            return np.full(q.shape, np.nan)
+        cumulative = np.cumsum(self.counts)
+        rank = q * (self.count - 1) + 1  # 1-based rank of the wanted value
+        index = np.minimum(np.searchsorted(cumulative, rank), self.counts.size - 1)
+        previous = np.where(index > 0, cumulative[np.maximum(index - 1, 0)], 0)
+        inner = (index > 0) & (index < self.counts.size - 1)
+        b = np.clip(index - 1, 0, self.edges.size - 2)
+        fraction = (rank - previous) / np.maximum(self.counts[index], 1)
+        value = self.edges[b] * (self.edges[b + 1] / self.edges[b])**np.clip(fraction, 0, 1)
+        value = np.where(inner, value, np.where(index == 0, self.min, self.max))
+        return np.clip(value, self.min, self.max)
+
+    def describe(self, q: Sequence[float] = (0.01, 0.05, 0.5, 0.95, 0.99)) -> Dict[str, float]:
+        summary = dict(count=self.count, nan_count=self.nan_count, mean=self.mean, std=self.std,
+                       min=self.min, max=self.max)
+        summary.update({f"q{100 * p:g}": value for p, value in zip(q, self.quantiles(q))})
+        return summary
+
+
+METRICS = ('PO', 'Tp', 'Ts_0', 'Ts_1', 'Ts_2', 'Ts_3', 'wn', 'zeta')
+
+
+def evaluate_chunk(m: np.ndarray, c: np.ndarray, k: np.ndarray) -> Dict[str, np.ndarray]:
+    """Step response metrics of the plants 1/(m s^2 + c s + k), NaN where invalid."""
+    batch = BatchParameterCalculation(k[:, None], np.column_stack([m, c, k]))
+    metrics = {name: getattr(batch, name) for name in METRICS}
+    # A critically or overdamped plant does not overshoot (and has no peak time)
+    metrics['PO'] = np.where(batch.valid & (batch.zeta >= 1), 0.0, metrics['PO'])
+    # Negative samples of m, c or k are not physical plants
+    physical = (m > 0) & (c >= 0) & (k > 0)
+    return {name: np.where(physical, value, np.nan) for name, value in metrics.items()}
+
+
+def _as_distribution(spec):
+    return spec if hasattr(spec, 'sample') else Constant(spec)
+
+
+def _run_chunk(args):
+    seed, size, distributions, metrics = args
+    rng = np.random.default_rng(seed)
+    m, c, k = (d.sample(rng, size) for d in distributions)
+    values = evaluate_chunk(m, c, k)
+    summaries = {}
+    for name in metrics:
+        summaries[name] = StreamingQuantiles()
+        summaries[name].update(values[name])
+    return summaries
+
+
+def monte_carlo(m, c, k, n_samples: int, seed: int = 0, metrics: Sequence[str] = ('PO', 'Tp', 'Ts_1'),
+                chunk_size: int = 1_000_000, workers: int = None) -> Dict[str, StreamingQuantiles]:
+    """
+    Distributions of step response metrics for random mass, damping and stiffness.
+
+    Args:
+        m, c, k: Distributions (Normal, Uniform, LogNormal, tolerance(...) or anything
+            with a sample(rng, n) method) or plain numbers for fixed values.
+        n_samples (int): Number of (m, c, k) samples.
+        seed (int): Seed of the SeedSequence every chunk's generator is spawned from.
+        metrics (sequence of str): Names from METRICS (Ts_1 is the 2% settling time).
+        chunk_size (int): Samples per task. Part of the random stream, so keep it fixed
+            to reproduce a run.
+        workers (int): Processes, defaults to os.cpu_count(). 1 runs in this process.
+
+    Returns:
+        dict: metric name -> StreamingQuantiles. Samples without a value (non physical
+            plants, Tp of non oscillating ones) are counted in nan_count.
+    """
+    unknown = set(metrics) - set(METRICS)
+    if unknown:
+        raise ValueError(f"Unknown metrics {sorted(unknown)}, choose from {METRICS}")
+    distributions = tuple(_as_distribution(spec) for spec in (m, c, k))
+    sizes = [min(chunk_size, n_samples - start) for start in range(0, n_samples, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(s, size, distributions, tuple(metrics)) for s, size in zip(seeds, sizes)]
+
+    totals = {name: StreamingQuantiles() for name in metrics}
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) == 1:
+        results = map(_run_chunk, tasks)
+        for summaries in results:
+            for name in metrics:
+                totals[name].merge(summaries[name])
+        return totals
+
+    with Pool(min(workers, len(tasks))) as pool:
+        # imap, not imap_unordered: merging in chunk order keeps results reproducible
+        for summaries in pool.imap(_run_chunk, tasks):
+            for name in metrics:
+                totals[name].merge(summaries[name])
+    return totals
+
+
+if __name__ == "__main__":
+    import time
+
+    # The vibrations_functions.py plant with ±5% mass, ±10% damping and ±3% stiffness
+    start = time.perf_counter()
+    result = monte_carlo(tolerance(61.48, 5), tolerance(535.8, 10, 'uniform'), tolerance(40_000, 3),
+                         n_samples=10_000_000, seed=1)
+    elapsed = time.perf_counter() - start
+    print(f"10^7 samples in {elapsed:.1f} s")
+    for name, summary in result.items():
+        d = summary.describe()
+        print(f"{name:>5}: mean {d['mean']:.5g}  std {d['std']:.3g}  "
+              f"1% {d['q1']:.5g}  median {d['q50']:.5g}  99% {d['q99']:.5g}")
@@ -0,0 +1,116 @@
+import os
+from multiprocessing import Pool, shared_memory
+
+import numpy as np
+
+from system_response import free_response
+
+# Free response sweeps over grids of (m, k, c or zeta, x0, v0).
+# The grid is flattened, cut into chunks and farmed out to a process pool. Each
+# worker evaluates system_response.free_response for its whole chunk at once and writes
+# the rows straight into one shared memory result array, so nothing but the small
+# parameter chunks is ever pickled. That block is returned as the result itself, not
+# copied out, so a sweep never needs twice its size in memory.
+
+_worker = {}
+
+
+class _ResultMemory(shared_memory.SharedMemory):
+    """
+    Shared memory whose mapping belongs to the arrays built on `buf`.
+
+    close() only releases the file descriptor. NumPy keeps the mmap object as the base
+    of every array view, so the mapping is unmapped when the last of them is freed and
+    the result outlives this object without a copy.
+    """
+
+    def close(self):
+        if getattr(self, '_fd', -1) >= 0:  # POSIX, the Windows handle lives in the mapping
+            os.close(self._fd)
+            self._fd = -1
+
+
+def _attach(shm_name: str, shape: tuple, t: np.ndarray):
+    """Pool initializer: map the shared result array once per worker."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _worker['shm'] = shm
+    _worker['out'] = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    _worker['t'] = t
+
+
+def free_response_chunk(t: np.ndarray, m, k, zeta, x0, v0) -> np.ndarray:
+    """Free response of P plants on a shared time vector, shape (P, T), in one vectorized pass."""
+    m, k, zeta, x0, v0 = (np.asarray(a, dtype=float)[:, None] for a in (m, k, zeta, x0, v0))
+    return free_response(t, zeta, np.sqrt(k/m), x0, v0)
+
+
+def _run_chunk(args):
+    start, stop, m, k, zeta, x0, v0 = args
+    _worker['out'][start:stop] = free_response_chunk(_worker['t'], m, k, zeta, x0, v0)
+    return stop - start
+
+
+def sweep_free_response(t, m, k, c=None, zeta=None, x0=1.0, v0=1.0, workers: int = None,
+                        chunk_size: int = 4096):
+    """
+    Evaluate the free response over the full grid of plant parameters.
+
+    Args:
+        t (array-like): Time vector, shape (T,).
+        m, k (float or array-like): Grids of mass and spring constant.
+        c, zeta (float or array-like): Grid of damping coefficients or of damping
+            ratios, exactly one of them must be given. With c the damping ratio is
+            c / (2 sqrt(k m)) for every (m, k) pair.
+        x0, v0 (float or array-like): Grids of initial displacement and velocity.
+        workers (int): Number of processes, defaults to os.cpu_count(). 1 runs in
+            the calling process without a pool.
+        chunk_size (int): Grid points per task.
+
+    Returns:
+        tuple: (params, response). params maps 'm', 'k', 'zeta', 'x0', 'v0' to arrays of
+            the grid shape (len(m), len(k), len(c or zeta), len(x0), len(v0)) and
+            response has that shape plus a trailing time axis. With a pool, response is
+            backed by the shared memory the workers wrote (already unlinked), which is
+            freed with the last array that refers to it.
+    """
+    if (c is None) == (zeta is None):
+        raise ValueError("Give exactly one of c or zeta")
+    t = np.asarray(t, dtype=float)
+    damping = c if zeta is None else zeta
+    grids = np.meshgrid(*(np.atleast_1d(np.asarray(a, dtype=float)) for a in (m, k, damping, x0, v0)),
+                        indexing='ij')
+    grid_shape = grids[0].shape
+    m_, k_, d_, x0_, v0_ = (g.ravel() for g in grids)
+    zeta_ = d_ if zeta is not None else d_ / (2 * np.sqrt(k_ * m_))
+    n_points = m_.size
+    params = {'m': grids[0], 'k': grids[1], 'zeta': zeta_.reshape(grid_shape), 'x0': grids[3], 'v0': grids[4]}
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or n_points <= chunk_size:
+        return params, free_response_chunk(t, m_, k_, zeta_, x0_, v0_).reshape(grid_shape + t.shape)
+
+    shape = (n_points, len(t))
+    shm = _ResultMemory(create=True, size=max(int(np.prod(shape)) * 8, 1))
+    try:
+        tasks = [(i, min(i + chunk_size, n_points), m_[i:i + chunk_size], k_[i:i + chunk_size],
+                  zeta_[i:i + chunk_size], x0_[i:i + chunk_size], v0_[i:i + chunk_size])
+                 for i in range(0, n_points, chunk_size)]
+        with Pool(workers, initializer=_attach, initargs=(shm.name, shape, t)) as pool:
+            for _ in pool.imap_unordered(_run_chunk, tasks):
+                pass
+        response = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    finally:
+        shm.close()
+        shm.unlink()
+    return params, response.reshape(grid_shape + t.shape)
+
+
+if __name__ == "__main__":
+    import time
+
+    t = np.linspace(0, 30, 2000)
+    start = time.perf_counter()
+    params, response = sweep_free_response(t, m=np.linspace(0.5, 5, 10), k=np.linspace(1, 50, 10),
+                                           zeta=np.linspace(0, 2, 20), x0=[0, 1], v0=[1, 2])
+    elapsed = time.perf_counter() - start
+    print(f"{params['m'].size} plants x {len(t)} samples in {elapsed:.2f} s")
@@ -0,0 +1,169 @@
+import numpy as np
+
+# Batched polynomial roots for stability screening of many transfer functions.
+# A stack of coefficient rows (descending powers of s) is solved in one call:
+# degree 1 and 2 rows in closed form, real cubics with one closed-form real root
+# (polished by Newton) deflated to a quadratic and all three roots polished once more
+# on the full cubic, and everything else (and the few cubics whose residual is still
+# too large) through the eigenvalues of a stack of companion matrices, so there is no
+# per-system Python overhead like calling scipy.signal.residue or np.roots in a loop.
+
+
+def _quadratic(a, b, c):
+    """Both roots of a s^2 + b s + c, shape (N, 2), without cancellation."""
+    s = np.sqrt(b.astype(complex)**2 - 4 * a * c)
+    # Pick the sign that adds magnitudes in b + s, the other root follows from c/q
+    s = np.where(np.real(np.conj(b) * s) < 0, -s, s)
+    q = -0.5 * (b + s)
+    safe = q != 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r1 = np.where(safe, q / a, 0)
+        r2 = np.where(safe, c / np.where(safe, q, 1), 0)
+    if not np.iscomplexobj(b):
+        # Complex roots of a real quadratic are exact conjugates (c/q only rounds to one)
+        r2 = np.where(r1.imag != 0, np.conj(r1), r2)
+    return np.stack([r1, r2], axis=1)
+
+
+def _cubic(a, b, c, d):
+    """All roots of real cubics a s^3 + b s^2 + c s + d, shape (N, 3)."""
+    b, c, d = b / a, c / a, d / a
+    # Depressed cubic t^3 + p t + q with s = t - b/3
+    p = c - b**2 / 3
+    q = 2 * b**3 / 27 - b * c / 3 + d
+    disc = (q / 2)**2 + (p / 3)**3
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sq = np.sqrt(np.maximum(disc, 0))
+        one_real = np.cbrt(-q / 2 + sq) + np.cbrt(-q / 2 - sq)
+        m = np.sqrt(np.maximum(-p / 3, 0))
+        arg = np.clip(np.where(m > 0, -q / (2 * m**3), 0), -1, 1)
+        three_real = 2 * m * np.cos(np.arccos(arg) / 3)
+    r = np.where(disc > 0, one_real, three_real) - b / 3
+    # A couple of Newton steps on the original cubic remove Cardano's rounding error
+    for _ in range(3):
+        f = ((r + b) * r + c) * r + d
+        df = (3 * r + 2 * b) * r + c
+        r = np.where(df != 0, r - f / np.where(df != 0, df, 1), r)
+    # Deflate: s^3 + b s^2 + c s + d = (s - r)(s^2 + e1 s + e0). Forward from the top
+    # coefficients for |r| <= 1, backward from d and c for larger |r|, where b + r
+    # cancels when r is the dominant root
+    with np.errstate(divide='ignore', invalid='ignore'):
+        big = np.abs(r) > 1
+        e0 = np.where(big, -d / r, 0)
+        e1 = np.where(big, (e0 - c) / r, b + r)
+        e0 = np.where(big, e0, c + r * e1)
+    roots = np.column_stack([r.astype(complex), _quadratic(np.ones_like(r), e1, e0)])
+    # Polish every root on the full cubic, then hand rows that are still off (Newton
+    # from a bad Cardano root, clustered roots) to the companion eigenvalues
+    coeffs = np.column_stack([np.ones_like(b), b, c, d])
+    with np.errstate(all='ignore'):
+        f = ((roots + b[:, None]) * roots + c[:, None]) * roots + d[:, None]
+        step = f / ((3 * roots + 2 * b[:, None]) * roots + c[:, None])
+        roots = np.where(np.isfinite(step), roots - step, roots)
+        f = ((roots + b[:, None]) * roots + c[:, None]) * roots + d[:, None]
+        scale = ((np.abs(roots) + np.abs(b[:, None])) * np.abs(roots) + np.abs(c[:, None])) * np.abs(roots) + \
+            np.abs(d[:, None])
+        bad = ~np.all(np.abs(f) <= 1e-12 * scale, axis=1) | ~np.all(np.isfinite(roots), axis=1)
+    if bad.any():
+        roots[bad] = _companion(coeffs[bad])
+    return roots
+
+
+def _companion(coeffs):
+    """Eigenvalues of the stacked companion matrices of rows with a nonzero leading term."""
+    n, deg = coeffs.shape[0], coeffs.shape[1] - 1
+    comp = np.zeros((n, deg, deg), dtype=coeffs.dtype)
+    comp[:, 0, :] = -coeffs[:, 1:] / coeffs[:, :1]
+    comp[:, np.arange(1, deg), np.arange(deg - 1)] = 1
+    return np.linalg.eigvals(comp)
+
+
+def batch_roots(coefficients) -> np.ndarray:
+    """
+    Roots of a stack of polynomials.
+
+    Args:
+        coefficients (array-like): (N, d+1) coefficients in descending powers. Rows may
+            start with zeros, which lowers their degree.
+
+    Returns:
+        np.ndarray: (N, d) complex roots, each row sorted by real then imaginary part
+            and padded with nan where the row has fewer than d roots. An all-zero row
+            gives all nan.
+    """
+    coeffs = np.atleast_2d(np.asarray(coefficients))
+    coeffs = coeffs.astype(complex if np.iscomplexobj(coeffs) else float)
+    n, width = coeffs.shape
+    out = np.full((n, max(width - 1, 0)), np.nan, dtype=complex)
+    nonzero = coeffs != 0
+    lead = np.argmax(nonzero, axis=1)
+    degree = np.where(nonzero.any(axis=1), width - 1 - lead, -1)
+
+    for deg in np.unique(degree):
+        if deg < 1:
+            continue
+        rows = np.nonzero(degree == deg)[0]
+        # Drop the leading zeros so every row of the group has a nonzero first term
+        group = coeffs[rows[:, None], (width - 1 - deg) + np.arange(deg + 1)]
+        if deg == 1:
+            roots = (-group[:, 1] / group[:, 0])[:, None]
+        elif deg == 2:
+            roots = _quadratic(*group.T)
+        elif deg == 3 and not np.iscomplexobj(group):
+            roots = _cubic(*group.T)
+        else:
+            roots = _companion(group)
+        out[rows, :deg] = np.sort(roots.astype(complex), axis=1)
+    return out
+
+
+def batch_zpk(numerators, denominators):
+    """
+    Zero-pole-gain form of a stack of transfer functions.
+
+    Args:
+        numerators (array-like): (N, m+1) numerator coefficients, or (m+1,) shared by all.
+        denominators (array-like): (N, n+1) denominator coefficients.
+
+    Returns:
+        tuple: (zeros (N, m), poles (N, n), gains (N,)), nan-padded as in batch_roots.
+            The gain is the ratio of the leading nonzero coefficients, so
+            G(s) = gain * prod(s - z) / prod(s - p) as in control.zpk.
+    """
+    den = np.atleast_2d(np.asarray(denominators))
+    num = np.asarray(numerators)
+    num = np.broadcast_to(num, (den.shape[0], num.shape[-1])) if num.ndim == 1 else num
+
+    def leading(rows):
+        idx = np.argmax(rows != 0, axis=1)
+        return rows[np.arange(rows.shape[0]), idx]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gains = leading(num) / leading(den)
+    return batch_roots(num), batch_roots(den), gains
+
+
+def zpk_systems(zeros, poles, gains) -> list:
+    """control.zpk systems for the rows of batch_zpk (nan padding removed)."""
+    import control as ct
+
+    return [ct.zpk(z[~np.isnan(z)], p[~np.isnan(p)], k) for z, p, k in zip(zeros, poles, gains)]
+
+
+def is_stable(poles) -> np.ndarray:
+    """Row-wise test that every (non-padding) pole lies in the open left half plane."""
+    poles = np.atleast_2d(poles)
+    return np.all(np.isnan(poles) | (poles.real < 0), axis=-1)
+
+
+if __name__ == "__main__":
+    import time
+
+    # Screen a million random 3rd and 5th order characteristic polynomials
+    rng = np.random.default_rng(0)
+    for degree in (3, 5):
+        dens = np.column_stack([np.ones(1_000_000), rng.uniform(0.1, 50, (1_000_000, degree))])
+        start = time.perf_counter()
+        stable = is_stable(batch_roots(dens))
+        elapsed = time.perf_counter() - start
+        print(f"degree {degree}: {dens.shape[0]} polynomials in {elapsed:.2f} s, {stable.mean():.1%} stable")
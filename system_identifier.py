@@ -1,29 +1,34 @@
 from dataclasses import dataclass
 from typing import List, Optional, Dict
 import numpy as np
-import seaborn as sbn
-import control as ct
-import matplotlib.pyplot as plt
+from analytic_response import analytic_response, ModalStepResponse
+from instrumentation import instrumented, stage
+from time_grid import time_grid
 
 #So far, code is only designed for step input types
 
+# The numeric core only needs NumPy. matplotlib and control are imported inside the
+# plot methods so batch jobs that never plot do not pay for them at import time.
+#
+# The @instrumented methods below report to instrumentation.py when it is enabled
+# (see that module); otherwise they cost one flag test per call.
+
 @dataclass
 class MySystem:
     NumeratorCoe: np.ndarray
     DenominatorCoe: np.ndarray
     order: int = None
 
+    @instrumented('MySystem')
     def __post_init__(self):
         assert sum(self.DenominatorCoe) != 0 and max(self.DenominatorCoe) != 0 and min(self.DenominatorCoe) != 0, "Denominator coefficients must be non-zero integers"
         self.determine_order()
 
     def determine_order(self) -> int:
-        if len(self.DenominatorCoe) == 2:
-            self.order = 1
-        elif len(self.DenominatorCoe) == 3:
-            self.order = 2
-        else:
-            raise ValueError("Not a valid number of coefficients, system must be either first order or second order")
+        if len(self.DenominatorCoe) < 2:
+            raise ValueError("Not a valid number of coefficients, system must be at least first order")
+        self.order = len(self.DenominatorCoe) - 1
+        return self.order
 
     # def import_system(self) -> tuple[np.ndarray]:
     #     return self.NumeratorCoe, self.DenominatorCoe
@@ -33,15 +38,148 @@ class InputType:
     input_type: str  # 'step', 'ramp', 'impulse'
     value: float
 
+SETTLING_BANDS = (0.01, 0.02, 0.05, 0.10)  # Ts_0, Ts_1, Ts_2, Ts_3
+
+
+@instrumented()
+def numeric_step_metrics(numerator_array: np.ndarray, denominator_array: np.ndarray,
+                         coarse_points: int = 256, max_points: int = 20000, tol: float = 1e-8) -> Dict[str, float]:
+    """
+    Extract step response metrics of an arbitrary order system numerically.
+
+    The response is sampled on a coarse grid sized from the poles (slowest decay for the
+    horizon, fastest oscillation for the step), then every crossing is refined on the
+    exact response by safeguarded Newton (bisection whenever a Newton step leaves the
+    bracket), so accuracy does not depend on the grid density.
+
+    Args:
+        numerator_array (np.ndarray): Numerator coefficients in descending order of s
+        denominator_array (np.ndarray): Denominator coefficients in descending order of s
+        coarse_points (int): Minimum number of samples on the coarse grid
+        max_points (int): Upper bound on the coarse grid size
+        tol (float): Absolute time tolerance of the refined crossings
+
+    Returns:
+        dict: Tr (10-90% rise time), Tp, PO and Ts_0..Ts_3 (1/2/5/10% settling times).
+            Unstable or zero-gain systems give NaN everywhere; systems without
+            overshoot give PO = 0 and Tp = NaN.
+    """
+    keys = ('Tr', 'Tp', 'PO', 'Ts_0', 'Ts_1', 'Ts_2', 'Ts_3')
+    metrics = dict.fromkeys(keys, np.nan)
+    response = ModalStepResponse(numerator_array, denominator_array)
+    poles = response.poles
+    yss = response.dc_gain
+    if np.any(poles.real >= 0) or not np.isfinite(yss) or yss == 0:
+        return metrics
+
+    horizon = 10 / np.min(-poles.real)
+    for _ in range(6):
+        t = time_grid(poles, horizon, min_points=coarse_points, max_points=max_points)
+        y = response(t) / yss
+        if abs(y[-1] - 1) <= SETTLING_BANDS[0]:
+            break
+        horizon *= 2
+
+    # Collect every bracket as (lo, hi, kind, level); kind 0 is a level crossing of y,
+    # 1 a band exit of |y - 1| and 2 a zero of dy/dt (the peak)
+    brackets = []
+
+    def crossing(level):
+        above = np.nonzero(y >= level)[0]
+        if len(above) == 0:
+            return None
+        k = above[0]
+        if k == 0:
+            return 0.0
+        brackets.append((t[k - 1], t[k], 0, level))
+        return len(brackets) - 1
+
+    rise = [crossing(0.1), crossing(0.9)]
+    settle = []
+    for band in SETTLING_BANDS:
+        outside = np.nonzero(np.abs(y - 1) > band)[0]
+        if len(outside) == 0:
+            settle.append(0.0)
+        elif outside[-1] == len(t) - 1:
+            settle.append(None)
+        else:
+            k = outside[-1]
+            brackets.append((t[k], t[k + 1], 1, band))
+            settle.append(len(brackets) - 1)
+    k_peak = int(np.argmax(y))
+    peak = None
+    if y[k_peak] > 1:
+        if k_peak == 0:
+            peak = 0.0
+        else:
+            brackets.append((t[k_peak - 1], t[min(k_peak + 1, len(t) - 1)], 2, 0.0))
+            peak = len(brackets) - 1
+
+    if brackets:
+        lo, hi, kind, level = (np.array(col) for col in zip(*brackets))
+        x = (lo + hi) / 2
+        # Safeguarded Newton on all brackets at once: Newton steps that leave the
+        # bracket fall back to bisection, so convergence is never worse than bisecting
+        for _ in range(64):
+            y0, y1, y2 = response.evaluate(x)
+            y0, y1, y2 = y0 / yss, y1 / yss, y2 / yss
+            sgn = np.sign(y0 - 1)
+            f = np.where(kind == 0, y0 - level, np.where(kind == 1, np.abs(y0 - 1) - level, y1))
+            fp = np.where(kind == 0, y1, np.where(kind == 1, sgn * y1, y2))
+            # kind 0 rises through the level, kinds 1 and 2 go from + to -
+            below = np.where(kind == 0, f < 0, f > 0)
+            lo = np.where(below, x, lo)
+            hi = np.where(below, hi, x)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                newton = x - f / fp
+            inside = np.isfinite(newton) & (newton > lo) & (newton < hi)
+            x_new = np.where(inside, newton, (lo + hi) / 2)
+            done = np.max(np.minimum(np.abs(x_new - x), hi - lo)) < tol
+            x = x_new
+            if done:
+                break
+        roots = x
+    else:
+        roots = np.array([])
+
+    def resolve(ref):
+        if ref is None:
+            return np.nan
+        if isinstance(ref, float):
+            return ref
+        return float(roots[ref])
+
+    t10, t90 = (resolve(r) for r in rise)
+    metrics['Tr'] = t90 - t10
+    for key, ref in zip(('Ts_0', 'Ts_1', 'Ts_2', 'Ts_3'), settle):
+        metrics[key] = resolve(ref)
+    if peak is None:
+        metrics['PO'] = 0.0
+    else:
+        metrics['Tp'] = resolve(peak)
+        metrics['PO'] = float(100 * (response(metrics['Tp']) / yss - 1))
+    return metrics
+
+
 class ParameterCalculation:
-    def __init__(self, numerator_array: np.ndarray, denominator_array: np.ndarray, order: int, input_value: float):
+    def __init__(self, numerator_array: np.ndarray, denominator_array: np.ndarray, order: int, input_value: float,
+                 reduction_tolerance: Optional[float] = None):
+        """
+        Args:
+            reduction_tolerance (float): For order > 2, analyze the dominant pole model
+                from model_reduction.py instead of simulating when its step response
+                error bound (fraction of the final value) is at most this. None always
+                simulates.
+        """
         self.num_coeff = numerator_array
         self.den_coeff = denominator_array
         self.order = order
         self.input = input_value
         self.tau = None
         self.Tp = None
+        self.Tr = None  # Rise time, only extracted numerically for higher order systems
         self.PO = None
+        self.Ts_0 = None
         self.Ts_1 = None
         self.Ts_2 = None
         self.Ts_3 = None 
@@ -49,18 +187,23 @@ class ParameterCalculation:
         self.ss_error = None
         self.wn = None  # Natural frequency
         self.zeta = None  # Damping ratio
+        self.reduction_tolerance = reduction_tolerance
+        self.error_bound = None  # Bound of the dominant pole model, if one was tried
         
         # Calculate parameters upon initialization
         self.calculate()
     
+    @instrumented()
     def calculate(self):
         """Calculate system parameters based on order."""
         if self.order == 1:
             self._calculate_first_order()
         elif self.order == 2:
             self._calculate_second_order()
+        elif self.order > 2:
+            self._calculate_higher_order()
         else:
-            raise ValueError("System must be first or second order")
+            raise ValueError("System must be at least first order")
     
     def _calculate_first_order(self):
         """Calculate first order system parameters."""
@@ -92,15 +235,52 @@ class ParameterCalculation:
         self.ss_response = K * self.input
         self.ss_error = self.input*(1-K)
     
+    def _calculate_higher_order(self):
+        """Calculate higher order system parameters from the simulated step response."""
+        if self.reduction_tolerance is not None and self._calculate_reduced():
+            metrics = {}
+        else:
+            metrics = numeric_step_metrics(self.num_coeff, self.den_coeff)
+        for key, value in metrics.items():
+            setattr(self, key, value)
+
+        # Steady state calculations
+        K = self.num_coeff[-1] / self.den_coeff[-1]  # DC gain
+        self.ss_response = K * self.input
+        self.ss_error = self.input*(1-K)
+
+    def _calculate_reduced(self) -> bool:
+        """Take the metrics of the dominant pole model if its error bound is small enough."""
+        from model_reduction import dominant_pole_reduction, reduced_metrics
+
+        reduced = dominant_pole_reduction(self.num_coeff, self.den_coeff)
+        self.error_bound = float(reduced.error_bound[0])
+        if self.error_bound > self.reduction_tolerance:
+            return False
+        row = reduced_metrics(reduced, self.input).records[0]
+        # Tr of a second order model has no closed form and stays NaN
+        for key in ('tau', 'wn', 'zeta', 'Tr', 'Tp', 'PO', 'Ts_0', 'Ts_1', 'Ts_2', 'Ts_3'):
+            setattr(self, key, row[key].item())
+        return True
+
+    def _step(self, t: np.ndarray) -> np.ndarray:
+        """Unit step response on t, closed form up to second order and modal above."""
+        if self.order <= 2:
+            return analytic_response(self.num_coeff, self.den_coeff, t, 'step')
+        return ModalStepResponse(self.num_coeff, self.den_coeff)(t)
+
+    @instrumented()
     def plot_response(self, show=True):
         """Generate basic time response plot."""
-        sys = ct.TransferFunction(self.num_coeff, self.den_coeff)
-        t = np.linspace(0, 10, 1000)
+        import matplotlib.pyplot as plt
+        from decimation import plot_decimated
+
+        t = time_grid(np.roots(self.den_coeff))
         u = np.ones_like(t) * self.input
-        _, y = ct.forced_response(sys, t, u)
+        y = self._step(t) * self.input
         
-        plt.plot(t, u, 'b-', label='Input: u(t)')
-        plt.plot(t, y, 'r--', label='Output: y(t)')
+        plot_decimated(plt.gca(), t, u, 'b-', label='Input: u(t)')
+        plot_decimated(plt.gca(), t, y, 'r--', label='Output: y(t)')
         plt.grid(True)
         plt.xlabel('Time (sec)')
         plt.ylabel('Amplitude (y)')
@@ -108,29 +288,46 @@ class ParameterCalculation:
         if show:
             plt.show()
 
+    @instrumented()
     def pole_plot(self, show=True):
         """Plot pole-zero map."""
+        import control as ct
+        import matplotlib.pyplot as plt
+
         sys = ct.TransferFunction(self.num_coeff, self.den_coeff)
         ct.pzmap(sys, plot=True, grid=True)
         plt.grid(True)
         if show:
             plt.show()
 
+    @instrumented()
     def step_plot(self, show=True):
         """Plot step response."""
-        sys = ct.TransferFunction(self.num_coeff, self.den_coeff)
-        t = np.linspace(0, 3, 1000)
-        t, y = ct.step_response(sys, t)
-        plt.plot(t, y)
+        import matplotlib.pyplot as plt
+        from decimation import plot_decimated
+
+        t = time_grid(np.roots(self.den_coeff))
+        y = self._step(t)
+        plot_decimated(plt.gca(), t, y)
         plt.grid(True)
         if show:
             plt.show()
 
+    @instrumented()
     def print_parameters(self):
         """Print system parameters."""
         print("\nSystem Parameters:")
         if self.order == 1:
             print(f"Time Constant (τ): {self.tau:.2f} sec")
+        elif self.order > 2:
+            print(f"Rise Time (Tr): {self.Tr:.2f} sec")
+            print(f"Peak Time (Tp): {self.Tp:.2f} sec")
+            print(f"Percent Overshoot: {self.PO:.1f}%")
+            print(f"Settling Times:")
+            print(f"  1%: {self.Ts_0:.2f} sec")
+            print(f"  2%: {self.Ts_1:.2f} sec")
+            print(f"  5%: {self.Ts_2:.2f} sec")
+            print(f" 10%: {self.Ts_3:.2f} sec")
         else:
             print(f"Natural Frequency (ωn): {self.wn:.2f} rad/s")
             print(f"Damping Ratio (ζ): {self.zeta:.2f}")
@@ -145,9 +342,234 @@ class ParameterCalculation:
         print(f"Steady State Error: {self.ss_error:.2f}")
 
 
+class BatchParameterCalculation:
+    """Vectorized ParameterCalculation over a stack of first/second order systems.
+
+    Every attribute of ParameterCalculation is stored as a NumPy column with one
+    entry per row. Rows that the scalar path would reject are flagged False in
+    `valid` (their metrics are NaN) instead of raising.
+    """
+
+    def __init__(self, numerator_array: np.ndarray, denominator_array: np.ndarray, input_value=1.0):
+        """
+        Args:
+            numerator_array (np.ndarray): (N,) or (N, m) numerator coefficients, descending powers of s.
+                The s^0 column is used as the numerator gain.
+            denominator_array (np.ndarray): (N, 2) or (N, 3) denominator coefficients, descending powers of s.
+                In an (N, 3) stack a row with a leading zero, e.g. [0, 1, 2], is treated as first order.
+            input_value (float or np.ndarray): Step amplitude, scalar or one per row.
+        """
+        num = np.asarray(numerator_array, dtype=float)
+        den = np.asarray(denominator_array, dtype=float)
+        if den.ndim != 2 or den.shape[1] not in (2, 3):
+            raise ValueError("Denominator stack must have shape (N, 2) or (N, 3)")
+        if num.ndim == 1:
+            num = num[:, None]
+        if num.ndim != 2 or num.shape[0] != den.shape[0]:
+            raise ValueError("Numerator stack must have one row per denominator row")
+        if den.shape[1] == 2:
+            den = np.hstack([np.zeros((den.shape[0], 1)), den])
+
+        self.num_coeff = num
+        self.den_coeff = den
+        self.input = np.broadcast_to(np.asarray(input_value, dtype=float), (den.shape[0],))
+
+        n = den.shape[0]
+        self.order = np.where(den[:, 0] != 0, 2, 1)
+        self.valid = np.zeros(n, dtype=bool)
+        self.tau = np.full(n, np.nan)
+        self.wn = np.full(n, np.nan)
+        self.zeta = np.full(n, np.nan)
+        self.Tp = np.full(n, np.nan)
+        self.PO = np.full(n, np.nan)
+        self.Ts_0 = np.full(n, np.nan)
+        self.Ts_1 = np.full(n, np.nan)
+        self.Ts_2 = np.full(n, np.nan)
+        self.Ts_3 = np.full(n, np.nan)
+        self.ss_response = np.full(n, np.nan)
+        self.ss_error = np.full(n, np.nan)
 
+        self.calculate()
+
+    def __len__(self):
+        return self.den_coeff.shape[0]
+
+    def calculate(self):
+        """Calculate all parameters in one vectorized pass."""
+        num, den = self.num_coeff, self.den_coeff
+        first = self.order == 1
+        second = ~first
+
+        finite = np.isfinite(den).all(axis=1) & np.isfinite(num).all(axis=1)
+        # Same rejections as MySystem: no zero coefficients in the denominator
+        lead = np.where(first, den[:, 1], den[:, 0])
+        self.valid = finite & (den[:, 1] != 0) & (den[:, 2] != 0)
+        # wn must be real for the second order formulas
+        self.valid &= first | (den[:, 2] / np.where(lead != 0, lead, 1) > 0)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            a0 = den[:, 2] / lead
+            a1 = den[:, 1] / lead
+            K = num[:, -1] / den[:, 2]  # DC gain
+
+            f = first & self.valid
+            self.tau[f] = 1 / a0[f]
+
+            s = second & self.valid
+            wn = np.sqrt(a0[s])
+            zeta = a1[s] / (2 * wn)
+            self.wn[s] = wn
+            self.zeta[s] = zeta
+            self.Tp[s] = np.pi / (wn * np.sqrt(1 - zeta**2))
+            self.PO[s] = 100 * np.exp(-zeta * np.pi / np.sqrt(1 - zeta**2))
+            sigma = zeta * wn
+            self.Ts_0[s] = 5 / sigma
+            self.Ts_1[s] = 4 / sigma
+            self.Ts_2[s] = 3 / sigma
+            self.Ts_3[s] = 2 / sigma
+
+            v = self.valid
+            self.ss_response[v] = K[v] * self.input[v]
+            self.ss_error[v] = self.input[v] * (1 - K[v])
+
+    def to_table(self) -> 'ResultTable':
+        """Copy the columns into a ResultTable."""
+        return ResultTable.from_batch(self)
+
+
+RESULT_FIELDS = ('order', 'valid', 'tau', 'wn', 'zeta', 'Tr', 'Tp', 'PO',
+                 'Ts_0', 'Ts_1', 'Ts_2', 'Ts_3', 'ss_response', 'ss_error')
+RESULT_DTYPE = np.dtype([('order', np.int8), ('valid', np.bool_)] +
+                        [(name, np.float64) for name in RESULT_FIELDS[2:]])
 
 
+class ResultRecord:
+    """
+    One row of a ResultTable with the ParameterCalculation attribute names.
+
+    Lets ParameterCalculation.print_parameters (and anything else written against a
+    single ParameterCalculation) read a table row without building the object.
+    """
+    __slots__ = ('_row',)
+
+    def __init__(self, row: np.void):
+        self._row = row
+
+    def __getattr__(self, name):
+        # copy and pickle look up dunder methods before _row is set
+        if name.startswith('_'):
+            raise AttributeError(name)
+        try:
+            value = self._row[name]
+        except (KeyError, ValueError):
+            raise AttributeError(name) from None
+        return value.item()
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={self._row[name]}" for name in RESULT_FIELDS)
+        return f"ResultRecord({fields})"
+
+    print_parameters = ParameterCalculation.print_parameters
+
+
+class ResultTable:
+    """
+    Compact step response metrics of many systems in one RESULT_DTYPE structured array.
+
+    About 100 bytes per system instead of a ParameterCalculation object with 15 loose
+    attributes. Indexing follows NumPy:
+        table['zeta']            column, a view into the table
+        table[3]                 ResultRecord, table[3].print_parameters() works
+        table[10:20], table[mask], table[[1, 5]]   sub-tables (a view for slices)
+    and table.records is the structured array itself, so np.save or batch_analysis
+    writers export it without a copy.
+    """
+
+    def __init__(self, records: np.ndarray):
+        if records.dtype != RESULT_DTYPE:
+            raise ValueError("records must have RESULT_DTYPE")
+        self.records = records
+
+    @classmethod
+    def empty(cls, n: int) -> 'ResultTable':
+        """Table of n invalid rows (all metrics NaN)."""
+        records = np.zeros(n, dtype=RESULT_DTYPE)
+        for name in RESULT_FIELDS[2:]:
+            records[name] = np.nan
+        return cls(records)
+
+    @classmethod
+    def from_batch(cls, batch: BatchParameterCalculation) -> 'ResultTable':
+        table = cls.empty(len(batch))
+        for name in RESULT_FIELDS:
+            if name != 'Tr':  # no closed form rise time up to second order
+                table.records[name] = getattr(batch, name)
+        return table
+
+    @classmethod
+    def from_parameters(cls, parameters) -> 'ResultTable':
+        """Pack ParameterCalculation objects (any order) into a table."""
+        parameters = list(parameters)
+        table = cls.empty(len(parameters))
+        for i, params in enumerate(parameters):
+            values = [getattr(params, name, None) for name in RESULT_FIELDS[2:]]
+            table.records[i] = (params.order, True) + tuple(np.nan if v is None else v for v in values)
+        return table
+
+    def __len__(self):
+        return self.records.shape[0]
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.records[key]
+        if isinstance(key, (int, np.integer)):
+            return ResultRecord(self.records[key])
+        return ResultTable(self.records[key])
+
+    def __iter__(self):
+        return (ResultRecord(row) for row in self.records)
+
+    def __repr__(self):
+        return f"ResultTable({len(self)} systems, {int(self.records['valid'].sum())} valid)"
+
+    def filter(self, condition=None, **ranges) -> 'ResultTable':
+        """
+        Rows that satisfy every given condition.
+
+        Args:
+            condition (np.ndarray or callable): Boolean mask, or a function of the
+                table returning one, e.g. lambda tab: tab['PO'] < 10.
+            ranges: column=(low, high) keeps low <= column <= high, either bound may
+                be None, e.g. filter(zeta=(0.4, 0.8), Ts_1=(None, 2.0)).
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if condition is not None:
+            mask &= condition(self) if callable(condition) else np.asarray(condition, dtype=bool)
+        for name, (low, high) in ranges.items():
+            column = self.records[name]
+            if low is not None:
+                mask &= column >= low
+            if high is not None:
+                mask &= column <= high
+        return ResultTable(self.records[mask])
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Every column as a view, e.g. for pandas.DataFrame(table.columns())."""
+        return {name: self.records[name] for name in RESULT_FIELDS}
+
+    def save(self, path: str):
+        """Write the table as a .npy structured array (load with ResultTable.load)."""
+        np.save(path, self.records)
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: Optional[str] = None) -> 'ResultTable':
+        return cls(np.load(path, mmap_mode=mmap_mode))
+
+
+
+
+
+@instrumented()
 def analyze_transfer_function(numerator_coeffs: list, denominator_coeffs: list, input_amplitude: float = 1.0, t_final: float = 10):
     """
     Analyze a transfer function with given numerator and denominator coefficients.
@@ -175,25 +597,26 @@ def analyze_transfer_function(numerator_coeffs: list, denominator_coeffs: list,
     params = ParameterCalculation(num, den, system.order, input_amplitude)
     params.calculate()
     
-    print("\nSystem Analysis:")
-    print("-" * 50)
-    print(f"Transfer Function: G(s) = {format_transfer_function(num, den)}")
-    print(f"Input: u(t) = {input_amplitude} (step input)")
-    print("-" * 50)
-    
-    if system.order == 1:
-        print(f"Time Constant (τ): {params.tau:.2f} seconds")
-    else: # second order
-        print(f"Natural Frequency (ωn): {params.wn:.2f} rad/s")
-        print(f"Damping Ratio (ζ): {params.zeta:.2f}")
-    
-    print(f"Steady State Response (yss): {params.ss_response:.2f}")
-    print(f"Steady State Error (ess): {params.ss_error:.2f}")
-    print("-" * 50)
-    params.print_parameters()
-    print("-" * 50)
-    
-
+    with stage('analyze_transfer_function.print'):
+        print("\nSystem Analysis:")
+        print("-" * 50)
+        print(f"Transfer Function: G(s) = {format_transfer_function(num, den)}")
+        print(f"Input: u(t) = {input_amplitude} (step input)")
+        print("-" * 50)
+    
+        if system.order == 1:
+            print(f"Time Constant (τ): {params.tau:.2f} seconds")
+        elif system.order > 2:
+            print(f"Rise Time (Tr): {params.Tr:.2f} seconds")
+        else: # second order
+            print(f"Natural Frequency (ωn): {params.wn:.2f} rad/s")
+            print(f"Damping Ratio (ζ): {params.zeta:.2f}")
+    
+        print(f"Steady State Response (yss): {params.ss_response:.2f}")
+        print(f"Steady State Error (ess): {params.ss_error:.2f}")
+        print("-" * 50)
+        params.print_parameters()
+        print("-" * 50)
 
     # Plot response
     params.plot_response(t_final)
@@ -202,6 +625,7 @@ def analyze_transfer_function(numerator_coeffs: list, denominator_coeffs: list,
 
 
 
+@instrumented()
 def format_transfer_function(num: np.ndarray, den: np.ndarray) -> str:
     """Format transfer function coefficients into a readable string."""
     def format_polynomial(coeffs: np.ndarray, var: str = 's') -> str:
@@ -229,6 +653,8 @@ def format_transfer_function(num: np.ndarray, den: np.ndarray) -> str:
 
 # Example usage
 if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
     # Problem 1: G(s) = 1/(s+2)
     print("\nProblem 1: First Order System")
     analyze_transfer_function([1], [1, 2], input_amplitude=4)
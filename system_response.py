@@ -1,7 +1,3 @@
-import sympy as sp
-import matplotlib.pyplot as plt
-from IPython.display import display, Latex
-from scipy.integrate import odeint 
 import numpy as np
 
 # Global parameters for the system
@@ -11,6 +7,73 @@ x_o = 1     # Initial displacement (m)
 v = 1       # Initial velocity (m/s)
 
 
+# Below this |u| = sqrt(|1 - Z^2|) wn t the regime formulas lose accuracy (and divide by
+# zero at Z = 1), so free_response switches to the Taylor series in (1 - Z^2)(wn t)^2
+SERIES_THRESHOLD = 0.1
+
+
+def free_response(t, Z, wn=None, x0=None, v0=None):
+    """
+    Free response for any damping ratio in a single vectorized call.
+
+    Parameters:
+    -----------
+    t : array-like
+        Time points.
+    Z : float or array-like
+        Damping ratio(s). Every element picks its own regime (undamped, under-,
+        critically or overdamped), so Z can mix all of them.
+    wn, x0, v0 : float or array-like, optional
+        Natural frequency, initial displacement and initial velocity. Default to
+        sqrt(K/M), x_o and v. Everything broadcasts against t.
+
+    Returns:
+    --------
+    np.ndarray
+        Displacement with the broadcast shape of the inputs. Z <= -1 gives NaN.
+    """
+    wn = np.sqrt(K/M) if wn is None else wn
+    x0 = x_o if x0 is None else x0
+    v0 = v if v0 is None else v0
+    t, Z, wn, x0, v0 = (np.asarray(a, dtype=float) for a in (t, Z, wn, x0, v0))
+    shape = np.broadcast_shapes(t.shape, Z.shape, wn.shape, x0.shape, v0.shape)
+
+    with np.errstate(all='ignore'):
+        a = np.broadcast_to(wn*t, shape)    # dimensionless time
+        q = 1 - Z**2                        # > 0 underdamped, < 0 overdamped
+        root = np.sqrt(np.abs(q))
+        u = root*a
+        B = Z*x0 + v0/wn
+        near = (u < SERIES_THRESHOLD) & (Z > -1)
+        under = ~near & (q > 0)
+        over = ~near & (q < 0) & (Z > 1)
+
+        # Underdamped, with the transcendental functions only evaluated where needed
+        cos_u = np.cos(u, out=np.zeros(shape), where=under)
+        sin_u = np.sin(u, out=np.zeros(shape), where=under)
+        decay = np.exp(-Z*a, out=np.zeros(shape), where=under)
+        x = decay * (x0*cos_u + B/root*sin_u)
+
+        # Overdamped written as two decaying exponentials so cosh/sinh never overflow;
+        # the slow rate uses -1/(Z + beta) to avoid cancelling -Z + beta for large Z
+        slow = np.exp(-a/(Z + root), out=np.zeros(shape), where=over)
+        fast = np.exp(-(Z + root)*a, out=np.zeros(shape), where=over)
+        x = np.where(over, x0*(slow + fast)/2 + B*(slow - fast)/(2*root), x)
+        if np.any(Z <= -1):
+            x[~(under | over | near)] = np.nan
+
+        # Near critical damping: cos(u), sin(u)/sqrt(q) and their hyperbolic versions as
+        # one series in w = q a^2, exact at Z = 1 and with no cancellation around it.
+        # This only covers the first few samples of most rows, so gather them.
+        if np.any(near):
+            an, Zn, x0n, Bn = (np.broadcast_to(arr, shape)[near] for arr in (a, Z, x0, B))
+            w = (1 - Zn**2)*an**2
+            C = 1 - w/2 + w**2/24 - w**3/720 + w**4/40320
+            S = 1 - w/6 + w**2/120 - w**3/5040 + w**4/362880
+            x[near] = np.exp(-Zn*an) * (x0n*C + Bn*an*S)
+
+    return x
+
 
 class system():
     """
@@ -21,7 +84,7 @@ class system():
     can be extended to calculate system time responses.
     """
     
-    def __init__(self, case=None, C_value=None, Z=None, wd=None, Sys_time_response=None):
+    def __init__(self, case=None, C_value=None, Z=None, wd=None, Sys_time_response=None, m=None, k=None, x0=None, v0=None):
         """
         Initialize the system_response object.
         
@@ -36,30 +99,38 @@ class system():
             Damping ratio. If None, will be calculated based on the case.
         Sys_time_response : array-like, optional
             System time response data. Can be populated later.
+        m, k, x0, v0 : float or array-like, optional
+            Mass, spring constant, initial displacement and initial velocity.
+            Default to the module level M, K, x_o and v. Arrays broadcast against
+            the time vector, e.g. shape (P, 1) gives a (P, T) response.
         """
         self.case = case
         self.C_value = C_value  # Damping coefficient
         self.Z = Z  
-        self.wn = np.sqrt(K/M) 
+        self.m = M if m is None else m
+        self.k = K if k is None else k
+        self.x0 = x_o if x0 is None else x0
+        self.v0 = v if v0 is None else v0
+        self.wn = np.sqrt(self.k/self.m) 
         self.wd = wd  # Don't calculate yet, will be set in declare_case
         self.Sys_time_response = Sys_time_response 
 
     
     def notdamped_response(self, t):
-        return x_o*np.cos(self.wn*t) + (v/self.wn)*np.sin(self.wn*t)
+        return self.x0*np.cos(self.wn*t) + (self.v0/self.wn)*np.sin(self.wn*t)
     
     def critically_damped_response(self, t):
-        return np.exp(-1*self.wn*t)*((self.wn*x_o + v)*t + x_o)
+        return np.exp(-1*self.wn*t)*((self.wn*self.x0 + self.v0)*t + self.x0)
     
     def overdamped_response(self, t):
         return np.exp(-self.Z*self.wn*t) * (
-            x_o * np.cosh(self.wn*np.sqrt(self.Z**2 - 1)*t) + 
-            (1/np.sqrt(self.Z**2 - 1)) * (self.Z*x_o + v/self.wn) * np.sinh(self.wn*np.sqrt(self.Z**2 - 1)*t)
+            self.x0 * np.cosh(self.wn*np.sqrt(self.Z**2 - 1)*t) + 
+            (1/np.sqrt(self.Z**2 - 1)) * (self.Z*self.x0 + self.v0/self.wn) * np.sinh(self.wn*np.sqrt(self.Z**2 - 1)*t)
         )
     def underdamped_response(self, t):
         return np.exp(-self.Z*self.wn*t) * (
-        x_o * np.cos(self.wd*t) + 
-        (1/np.sqrt(1 - self.Z**2)) * (self.Z*x_o + v/self.wn) * np.sin(self.wd*t)
+        self.x0 * np.cos(self.wd*t) + 
+        (1/np.sqrt(1 - self.Z**2)) * (self.Z*self.x0 + self.v0/self.wn) * np.sin(self.wd*t)
     )
 
 
@@ -74,18 +145,18 @@ class system():
             self.wd = self.wn # For undamped, wd = wn
             
         elif self.case == 'Critically Damped':
-            self.C_value = 2*np.sqrt(K*M)  # C = 2√(km)
+            self.C_value = 2*np.sqrt(self.k*self.m)  # C = 2√(km)
             self.Z = 1                      # Z = 1
             self.wd = 0  # No oscillation
             
         elif self.case == 'Over Damped':
-            self.C_value = 3*np.sqrt(K*M)  # Set C > 2√(km), let's use 3√(km)
-            self.Z = self.C_value/(2*np.sqrt(K*M))  # This will give Z > 1
+            self.C_value = 3*np.sqrt(self.k*self.m)  # Set C > 2√(km), let's use 3√(km)
+            self.Z = self.C_value/(2*np.sqrt(self.k*self.m))  # This will give Z > 1
             self.wd = self.wn*np.sqrt(1 - self.Z**2 )
             
         elif self.case == "Underdamped":
-            self.C_value = np.sqrt(K*M)  # Set C < 2√(km), let's use √(km)
-            self.Z = self.C_value/(2*np.sqrt(K*M))  # This will give Z < 1
+            self.C_value = np.sqrt(self.k*self.m)  # Set C < 2√(km), let's use √(km)
+            self.Z = self.C_value/(2*np.sqrt(self.k*self.m))  # This will give Z < 1
             self.wd = self.wn*np.sqrt(1 - self.Z**2 )
 
         print(f"C value: {self.C_value}, Damping ratio: {self.Z}")
@@ -101,9 +172,19 @@ class system():
         elif self.case == 'Underdamped':
             return self.underdamped_response(t)
 
-    def plot_response(self, time_interval, notdamped=False, criticallydamped=False, overdamped=False, underdamped=False):
-        """Plot selected responses"""
-        time = np.linspace(0, time_interval, time_interval*100)
+    def plot_response(self, time_interval=None, notdamped=False, criticallydamped=False, overdamped=False,
+                      underdamped=False):
+        """
+        Plot selected responses (decimated to the axes width, see decimation.py).
+
+        Every case is simulated on its own time_grid.py grid, so the resolution follows
+        its poles. time_interval fixes the end time, None runs each case until it has
+        settled (10 periods for the undamped case).
+        """
+        import matplotlib.pyplot as plt
+        from decimation import plot_decimated
+        from time_grid import second_order_poles, time_grid
+
         
         cases = {
             'Not Damped': notdamped,
@@ -116,8 +197,9 @@ class system():
         for case_name, plot_flag in cases.items():
             if plot_flag:
                 self.declare_case(case_name)  # Set up parameters
+                time = time_grid(second_order_poles(self.Z, self.wn), time_interval)
                 response = self.calculate_response(time)  # Calculate using time array
-                plt.plot(time, response, label=case_name)
+                plot_decimated(plt.gca(), time, response, label=case_name)
         
         plt.title('System Response')
         plt.xlabel('Time (s)')
@@ -127,18 +209,19 @@ class system():
         plt.show()
 
 
-# critically_damp = system()
-# critically_damp.declare_case("Critically Damped")
+if __name__ == "__main__":
+    # critically_damp = system()
+    # critically_damp.declare_case("Critically Damped")
 
-# Create an instance of the system
-system_instance = system()
+    # Create an instance of the system
+    system_instance = system()
 
-# Plot all cases (10 second time interval)
-system_instance.plot_response(30, 
-                            notdamped=True, 
-                            criticallydamped=True, 
-                            overdamped=True, 
-                            underdamped=True)
+    # Plot all cases (10 second time interval)
+    system_instance.plot_response(30, 
+                                notdamped=True, 
+                                criticallydamped=True, 
+                                overdamped=True, 
+                                underdamped=True)
 
 
 
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from analytic_response import analytic_response
+
+ct = pytest.importorskip('control')
+
+T = np.linspace(0, 10, 501)
+SYSTEMS = {
+    'underdamped': ([49], [1, 7.392, 49]),
+    'critical': ([4], [1, 4, 4]),
+    'overdamped': ([6], [1, 5, 6]),
+    'zero': ([2, 3], [1, 2, 5]),
+    'biproper': ([1, 3, 2], [1, 4, 8]),
+    'first order': ([3], [2, 1]),
+}
+
+
+def reference(num, den, input_type):
+    sys = ct.tf(num, den)
+    if input_type == 'step':
+        return ct.step_response(sys, T).outputs
+    if input_type == 'impulse':
+        return ct.impulse_response(sys, T).outputs
+    # forced_response interpolates the input linearly, which is exact for a ramp
+    return ct.forced_response(sys, T, T).outputs
+
+
+# Both leave out the Dirac term of a biproper impulse response, control warns about it
+@pytest.mark.filterwarnings('ignore:System has direct feedthrough')
+@pytest.mark.parametrize('input_type', ['step', 'ramp', 'impulse'])
+@pytest.mark.parametrize('name', SYSTEMS)
+def test_matches_control(name, input_type):
+    num, den = SYSTEMS[name]
+    y = analytic_response(num, den, T, input_type)
+    np.testing.assert_allclose(y, reference(num, den, input_type), rtol=1e-9, atol=1e-10)
+
+
+def test_stack_matches_single_systems():
+    nums = [[0, 0, 49], [0, 0, 4], [0, 0, 6], [0, 2, 3]]
+    dens = [[1, 7.392, 49], [1, 4, 4], [1, 5, 6], [1, 2, 5]]
+    amplitude = np.array([1.0, 2.0, 0.5, 3.0])
+    stacked = analytic_response(nums, dens, T, 'step', amplitude)
+    for i in range(len(dens)):
+        np.testing.assert_allclose(stacked[i], amplitude[i] * analytic_response(nums[i], dens[i], T, 'step'))
+
+
+def test_invalid_rows_are_nan():
+    y = analytic_response([[1], [1]], [[1, 2, 1], [1, 1, 0]], T)
+    assert np.isfinite(y[0]).all() and np.isnan(y[1]).all()
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from frequency_response import batch_frequency_response
+
+ct = pytest.importorskip('control')
+
+SYSTEMS = [
+    ([2], [1, 3, 3, 1]),
+    ([26], [1, 3, 28, 26]),
+    ([104], [1, 6, 34, 104]),
+    ([41], [1, 9, 49, 41]),
+    ([1], [1, 2, 1, 0]),
+    ([10], [1, 3, 3, 1]),
+]
+
+
+@pytest.mark.parametrize('points, rtol, pm_atol', [(200, 2e-2, 0.5), (2000, 1e-4, 1e-2)])
+def test_margins_match_control(points, rtol, pm_atol):
+    omega = np.logspace(-2, 2, points)
+    nums = [np.pad(n, (4 - len(n), 0)) for n, _ in SYSTEMS]
+    dens = [np.pad(d, (4 - len(d), 0)) for _, d in SYSTEMS]
+    # A chunk size that splits crossings across chunk boundaries
+    result = batch_frequency_response(nums, dens, omega, chunk_size=37, keep_response=False)
+    for i, (num, den) in enumerate(SYSTEMS):
+        gm, pm, wpc, wgc = ct.margin(ct.tf(num, den))
+        np.testing.assert_allclose(result['gain_margin'][i], gm, rtol=rtol)
+        np.testing.assert_allclose(result['phase_crossover'][i], wpc, rtol=rtol)
+        if np.isfinite(wgc):
+            np.testing.assert_allclose(result['gain_crossover'][i], wgc, rtol=rtol)
+            np.testing.assert_allclose(result['phase_margin'][i], pm, rtol=rtol, atol=pm_atol)
+
+
+def test_crossover_lies_inside_its_bracket():
+    omega = np.logspace(-2, 2, 200)
+    result = batch_frequency_response([[2]], [[1, 3, 3, 1]], omega)
+    i = np.searchsorted(omega, result['phase_crossover'][0])
+    assert result['phase'][0, i - 1] >= -180 >= result['phase'][0, i]
+
+
+@pytest.mark.parametrize('num, den', [([1], [1, 1, 0, 0]), ([4], [1, -1, 4]), ([-10], [1, 1]),
+                                      ([-10], [1, 3, 3, 1])])
+def test_wrapped_phase_margin_and_negative_dc_gain(num, den):
+    omega = np.logspace(-3, 3, 20001)
+    result = batch_frequency_response([num], [den], omega, keep_response=False)
+    gm, pm, wpc, wgc = ct.margin(ct.tf(num, den))
+    np.testing.assert_allclose(result['phase_margin'][0], pm, atol=1e-3)
+    if np.isfinite(gm):
+        np.testing.assert_allclose(result['gain_margin'][0], gm, rtol=1e-3)
+        np.testing.assert_allclose(result['phase_crossover'][0], wpc, atol=1e-3)
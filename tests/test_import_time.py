@@ -0,0 +1,27 @@
+import os
+import subprocess
+import sys
+
+# system_identifier's numeric core must import with NumPy only, plotting and control
+# are imported lazily
+IMPORT_BUDGET_S = 1.0
+HEAVY_MODULES = ('matplotlib', 'control', 'scipy')
+
+SCRIPT = f"""
+import sys, time
+start = time.perf_counter()
+import system_identifier
+print(time.perf_counter() - start)
+print(' '.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))
+"""
+
+
+def test_system_identifier_imports_lightly():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env.pop('MSD_PROFILE', None)
+    result = subprocess.run([sys.executable, '-c', SCRIPT], cwd=root, env=env,
+                            capture_output=True, text=True, check=True)
+    elapsed, loaded = (result.stdout.splitlines() + [''])[:2]
+    assert loaded == '', f"system_identifier imported {loaded}"
+    assert float(elapsed) < IMPORT_BUDGET_S
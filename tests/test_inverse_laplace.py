@@ -0,0 +1,38 @@
+import os
+
+import numpy as np
+import pytest
+
+import inverse_laplace
+from inverse_laplace import inverse_laplace as numeric_inverse_laplace
+from inverse_laplace import symbolic_inverse_laplace
+
+pytest.importorskip('sympy')
+
+CASES = [([1], [1, 14, 59, 70], '1/(s**3 + 14*s**2 + 59*s + 70)'),
+         ([1], [1, 11, 45, 81, 54], '1/(s**4 + 11*s**3 + 45*s**2 + 81*s + 54)'),
+         ([1], [1, 5, 11, 15], '1/(s**3 + 5*s**2 + 11*s + 15)')]
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(inverse_laplace, '_compiled', {})
+
+
+@pytest.mark.filterwarnings('error')
+@pytest.mark.parametrize('num, den, expression', CASES)
+def test_symbolic_matches_numeric_at_long_times(tmp_path, num, den, expression):
+    t = np.array([0.0, 0.5, 1.0, 5.0, 150.0, 200.0, 1000.0])
+    exact = symbolic_inverse_laplace(expression, cache_dir=str(tmp_path))
+    values = exact(t)
+    assert np.all(np.isfinite(values))
+    np.testing.assert_allclose(values, numeric_inverse_laplace(num, den, 'impulse')(t), rtol=1e-9, atol=1e-14)
+
+
+def test_cache_key_includes_generator_version(tmp_path, monkeypatch):
+    expression = CASES[0][2]
+    symbolic_inverse_laplace(expression, cache_dir=str(tmp_path))
+    monkeypatch.setattr(inverse_laplace, 'GENERATOR_VERSION', inverse_laplace.GENERATOR_VERSION + 1)
+    monkeypatch.setattr(inverse_laplace, '_compiled', {})
+    symbolic_inverse_laplace(expression, cache_dir=str(tmp_path))
+    assert len(os.listdir(tmp_path)) == 2
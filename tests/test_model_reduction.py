@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from model_reduction import dominant_pole_reduction
+from plant_cache import Plant
+
+# The reviewer's examples, the HW10_P1_Dominant_Poles.m plants and G1 of HW10 with a
+# real pole 100x further out
+PLANTS = [
+    ([6], [1, 6, 11, 6]),
+    ([2, 10], [1, 8, 17, 10]),
+    ([26], [1, 3, 28, 26]),
+    ([104], [1, 6, 34, 104]),
+    ([41], [1, 9, 49, 41]),
+    ([2600], list(np.polymul([1, 2, 26], [1, 100]))),
+]
+
+
+def _true_error(num, den, reduced, i):
+    t = np.linspace(0, 30, 100_001)
+    y = Plant.from_tf(num, den).step(t)
+    y_r = Plant.from_tf(reduced.numerator[i], np.trim_zeros(reduced.denominator[i], 'f')).step(t)
+    return np.max(np.abs(y - y_r)) / abs(reduced.dc_gain[i])
+
+
+def test_bound_is_tight_on_hw10_plants():
+    reduced = dominant_pole_reduction([np.pad(n, (3 - len(n), 0)) for n, _ in PLANTS], [d for _, d in PLANTS])
+    for i, (num, den) in enumerate(PLANTS):
+        error = _true_error(num, den, reduced, i)
+        assert error <= reduced.error_bound[i] <= 1.1 * error
+    # Only the well separated plant is within a 5% bound
+    np.testing.assert_array_equal(reduced.error_bound <= 0.05, [False] * 5 + [True])
+
+
+def test_bound_holds_on_a_random_fleet():
+    rng = np.random.default_rng(1)
+    # One or two extra poles keep Plant on its closed form step response
+    dens = np.zeros((20, 5))
+    for i in range(dens.shape[0]):
+        wn, zeta = rng.uniform(1, 10), rng.uniform(0.2, 0.8)
+        extra = -zeta * wn * rng.uniform(5, 100, rng.integers(1, 3))
+        den = np.polymul([1, 2 * zeta * wn, wn**2], np.poly(extra))
+        dens[i, 5 - den.size:] = den
+    nums = dens[:, -1:]
+    reduced = dominant_pole_reduction(nums, dens)
+    for i in range(dens.shape[0]):
+        error = _true_error(nums[i], np.trim_zeros(dens[i], 'f'), reduced, i)
+        assert error <= reduced.error_bound[i] <= 1.1 * error + 1e-12
+
+
+@pytest.mark.parametrize('den', [[1, 2, 1], [1, 3, 3, 1], [1, 4, 5, 2]])
+def test_repeated_pole_gets_no_bound(den):
+    # 1/(s+1)^2 is critically damped, (s+1)^2 (s+2) has a repeated dominant pole
+    assert dominant_pole_reduction([[den[-1]]], [np.pad(den, (4 - len(den), 0))]).error_bound[0] == np.inf
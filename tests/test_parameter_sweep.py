@@ -0,0 +1,27 @@
+import gc
+import mmap
+
+import numpy as np
+
+from parameter_sweep import sweep_free_response
+
+T = np.linspace(0, 5, 300)
+GRID = dict(m=np.linspace(0.5, 5, 4), k=np.linspace(1, 50, 5), zeta=np.linspace(0, 2, 6), x0=[0, 1], v0=[1, 2])
+
+
+def test_pool_result_is_the_shared_block():
+    _, expected = sweep_free_response(T, **GRID, workers=1)
+    params, response = sweep_free_response(T, **GRID, workers=2, chunk_size=50)
+    np.testing.assert_array_equal(response, expected)
+    assert response.shape == params['m'].shape + T.shape
+    # Not copied into private memory: the array views the shared memory buffer
+    base = response
+    while isinstance(base, np.ndarray):
+        base = base.base
+    assert isinstance(base, mmap.mmap)
+
+    # Views keep the block mapped after the sweep result itself is gone
+    view = np.asarray(response[1, 2])
+    del response
+    gc.collect()
+    np.testing.assert_array_equal(view, expected[1, 2])
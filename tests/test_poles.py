@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from poles import batch_roots, batch_zpk, is_stable, zpk_systems
+
+
+def relative_residual(coefficients, roots):
+    """|p(r)| relative to the size of the terms summed in p(r), per root."""
+    return np.abs(np.polyval(coefficients, roots)) / np.polyval(np.abs(coefficients), np.abs(roots))
+
+
+@pytest.mark.parametrize('coefficients', [[1, 9.23e5, 0.1545, 0.205], [1, 4.84e5, 4.118, 0.454],
+                                          [1, 1e8, 1, 1], [1, 3, 3, 1], [1, 6, 11, 6], [2, 0, 0, -16]])
+def test_cubic_matches_np_roots(coefficients):
+    roots = batch_roots([coefficients])[0]
+    expected = np.sort(np.roots(coefficients))
+    # np.roots itself is only good to eps^(1/3) on the triple root of [1, 3, 3, 1]
+    np.testing.assert_allclose(roots, expected, rtol=1e-4, atol=1e-12)
+    assert np.max(relative_residual(coefficients, roots)) < 1e-10
+    assert is_stable(roots) == np.all(expected.real < 0)
+
+
+@pytest.mark.parametrize('signed', [False, True])
+def test_cubic_wide_coefficient_range(signed):
+    rng = np.random.default_rng(0)
+    coefficients = 10**rng.uniform(-3, 6, (20_000, 4))
+    if signed:
+        coefficients *= rng.choice([-1, 1], coefficients.shape)
+    roots = batch_roots(coefficients)
+    residual = np.array([relative_residual(c, r) for c, r in zip(coefficients, roots)])
+    assert np.max(residual) < 1e-9
+    expected = np.array([np.all(np.roots(c).real < 0) for c in coefficients])
+    np.testing.assert_array_equal(is_stable(roots), expected)
+
+
+def test_lower_degree_rows_are_padded():
+    roots = batch_roots([[0, 0, 1, 2], [0, 1, 3, 2], [0, 0, 0, 0]])
+    np.testing.assert_allclose(roots[0, 0], -2)
+    np.testing.assert_allclose(roots[1, :2], [-2, -1])
+    assert np.isnan(roots[0, 1:]).all() and np.isnan(roots[1, 2]) and np.isnan(roots[2]).all()
+
+
+@pytest.mark.parametrize('degree', [2, 3, 5])
+def test_complex_roots_of_real_polynomials_are_exact_pairs(degree):
+    rng = np.random.default_rng(degree)
+    roots = batch_roots(rng.uniform(-10, 10, (2000, degree + 1)))
+    for row in roots:
+        np.testing.assert_array_equal(np.sort_complex(row), np.sort_complex(np.conj(row)))
+
+
+def test_zpk_systems_match_control():
+    ct = pytest.importorskip('control')
+    # The last two rows are HW10_program.py plants with complex pole pairs
+    num, den = [[0, 1, 2], [0, 0, 4], [0, 0, 104], [0, 0, 41]], [[1, 2, 5, 3], [2, 1, 8, 4], [1, 6, 34, 104],
+                                                                  [1, 9, 49, 41]]
+    zeros, poles, gains = batch_zpk(num, den)
+    for system, n, d in zip(zpk_systems(zeros, poles, gains), num, den):
+        w = np.logspace(-1, 2, 50)
+        np.testing.assert_allclose(system(1j * w), ct.tf(n, d)(1j * w), rtol=1e-10)
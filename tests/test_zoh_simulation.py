@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from scipy.integrate import odeint
+
+from zoh_simulation import ZOHStream, simulate_zoh
+
+M, C, K = 61.48, 535.8, 40_000
+DT = 1e-3
+
+
+def odeint_piecewise(m, c, k, force, dt, x0=0.0, v0=0.0):
+    """Reference: odeint over every sample interval with the force held constant."""
+    state = np.array([x0, v0], dtype=float)
+    x, v = np.empty(force.size), np.empty(force.size)
+    for n, f in enumerate(force):
+        x[n], v[n] = state
+        state = odeint(lambda s, _: [s[1], (f - c * s[1] - k * s[0]) / m], state, [0, dt],
+                       rtol=1e-12, atol=1e-14)[-1]
+    return x, v
+
+
+@pytest.fixture
+def force():
+    rng = np.random.default_rng(0)
+    t = np.arange(400) * DT
+    return 1000 + 200 * np.sin(2 * np.pi * 5 * t) + 50 * rng.standard_normal(t.size)
+
+
+def test_matches_piecewise_constant_odeint(force):
+    x, v = simulate_zoh(M, C, K, force, DT, x0=0.01, v0=-0.2)
+    x_ref, v_ref = odeint_piecewise(M, C, K, force, DT, x0=0.01, v0=-0.2)
+    np.testing.assert_allclose(x, x_ref, rtol=0, atol=1e-9 * np.max(np.abs(x_ref)))
+    np.testing.assert_allclose(v, v_ref, rtol=0, atol=1e-9 * np.max(np.abs(v_ref)))
+
+
+def test_plant_stack_matches_single_plants(force):
+    c = np.array([100.0, 535.8, 2000.0])
+    x, v = simulate_zoh(M, c, K, force, DT, x0=[0.0, 0.01, 0.02])
+    for p in range(c.size):
+        x_p, v_p = simulate_zoh(M, c[p], K, force, DT, x0=[0.0, 0.01, 0.02][p])
+        np.testing.assert_allclose(x[p], x_p, rtol=1e-12, atol=1e-18)
+        np.testing.assert_allclose(v[p], v_p, rtol=1e-12, atol=1e-18)
+
+
+def test_benchmark_runs():
+    from benchmarks import run_benchmarks
+
+    results = run_benchmarks('small', pattern='^forced/simulate_zoh$', repeat=1, min_time=0, progress=False)
+    assert list(results['results']) == ['forced/simulate_zoh[10000]']
+    assert results['results']['forced/simulate_zoh[10000]']['best'] > 0
+
+
+@pytest.mark.parametrize('chunk', [1, 7, 100, 400])
+def test_stream_matches_simulate_zoh(force, chunk):
+    x_ref, _ = simulate_zoh(M, C, K, force, DT, x0=0.01, v0=-0.2)
+    stream = ZOHStream(M, C, K, DT, x0=0.01, v0=-0.2)
+    x = np.concatenate(list(stream.run(force[i:i + chunk] for i in range(0, force.size, chunk))))
+    np.testing.assert_allclose(x, x_ref, rtol=1e-12, atol=1e-18)
+    assert stream.samples == force.size
+
+
+def test_stream_chunks_stay_valid(force):
+    c = np.array([100.0, 535.8])
+    stream = ZOHStream(M, c, K, DT)
+    chunks = [stream.update(force[i:i + 50]) for i in range(0, force.size, 50)]
+    x_ref, _ = simulate_zoh(M, c, K, force, DT)
+    np.testing.assert_allclose(np.hstack(chunks), x_ref, rtol=1e-12, atol=1e-18)
+
+    stream.reset(x0=0.01)
+    x_ref, _ = simulate_zoh(M, c, K, force[:50], DT, x0=0.01)
+    np.testing.assert_allclose(stream.update(force[:50]), x_ref, rtol=1e-12, atol=1e-18)
+
+
+def test_stream_writes_into_out_buffer(force):
+    x_ref, _ = simulate_zoh(M, C, K, force, DT)
+    stream = ZOHStream(M, C, K, DT)
+    buffer = np.empty(64)
+    chunks = []
+    for chunk in stream.run((force[i:i + 64] for i in range(0, force.size, 64)), out=buffer):
+        assert np.shares_memory(chunk, buffer)
+        chunks.append(chunk.copy())
+    np.testing.assert_allclose(np.concatenate(chunks), x_ref, rtol=1e-12, atol=1e-18)
+    with pytest.raises(ValueError):
+        stream.update(force[:65], out=buffer)
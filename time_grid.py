@@ -0,0 +1,72 @@
+import numpy as np
+
+# Time vectors sized from the poles of the system being simulated, shared by every
+# simulate and plot entry point instead of fixed 0-10 s / 0-3 s grids.
+#   - horizon: a number of time constants of the slowest decaying pole, so slow plants
+#     are shown until they settle (a number of periods of the slowest undamped
+#     oscillation, or time constants of the slowest growing mode, when something does
+#     not decay)
+#   - resolution: points_per_period samples per period of the fastest oscillation
+#     (2 pi / |Im p|), so fast plants are not aliased, with at least min_points and at
+#     most max_points samples in total. Fast real poles only shape the first few
+#     samples and do not raise the count.
+
+
+def second_order_poles(zeta, wn) -> np.ndarray:
+    """Poles -zeta wn ± wn sqrt(zeta^2 - 1) of one or many second order systems, flattened."""
+    zeta, wn = np.broadcast_arrays(np.asarray(zeta, dtype=float), np.asarray(wn, dtype=float))
+    root = wn * np.sqrt(zeta.astype(complex)**2 - 1)
+    return np.concatenate([(-zeta * wn + root).ravel(), (-zeta * wn - root).ravel()])
+
+
+def horizon(poles, time_constants: float = 8.0, cycles: float = 10.0, default: float = 10.0) -> float:
+    """
+    Simulation length covering every mode of `poles`.
+
+    Args:
+        poles (array-like): Poles of one or several systems (NaN entries are ignored).
+        time_constants (float): Multiples of 1 / |Re p| for decaying and growing
+            modes. 8 takes a simple mode below 0.1% and a double pole (critical
+            damping) below 0.5%, past the 1% settling time.
+        cycles (float): Periods of an undamped oscillation to show.
+        default (float): Used when no pole sets a time scale (e.g. only integrators).
+    """
+    poles = np.asarray(poles, dtype=complex).ravel()
+    poles = poles[np.isfinite(poles)]
+    decay = -poles.real
+    candidates = [time_constants / decay[decay > 0].min()] if np.any(decay > 0) else []
+    undamped = poles[(decay <= 0) & (poles.imag != 0)]
+    if undamped.size:
+        candidates.append(cycles * 2 * np.pi / np.abs(undamped.imag).min())
+    growing = poles[(decay < 0) & (poles.imag == 0)]
+    if growing.size:
+        candidates.append(time_constants / growing.real.max())
+    return float(max(candidates)) if candidates else default
+
+
+def time_grid(poles, t_final: float = None, points_per_period: int = 20, min_points: int = 200,
+              max_points: int = 20_000, **horizon_options) -> np.ndarray:
+    """
+    Evenly spaced time points from 0 that resolve the fastest oscillation and cover the
+    slowest mode.
+
+    Args:
+        poles (array-like): Poles of the system (or of all systems sharing the grid).
+        t_final (float): Fixed end time, computed with horizon() if None.
+        points_per_period (int): Samples per period of the fastest oscillation.
+        min_points, max_points (int): Bounds on the number of intervals.
+        **horizon_options: time_constants, cycles or default for horizon().
+
+    Example:
+        t = time_grid(np.roots([1, 7.392, 49]))
+    """
+    poles = np.asarray(poles, dtype=complex).ravel()
+    poles = poles[np.isfinite(poles)]
+    if t_final is None:
+        t_final = horizon(poles, **horizon_options)
+    dt = t_final / min_points
+    fastest = np.max(np.abs(poles.imag), initial=0.0)
+    if fastest > 0:
+        dt = min(dt, 2 * np.pi / fastest / points_per_period)
+    n_points = int(min(max(np.ceil(t_final / dt), min_points), max_points)) + 1
+    return np.linspace(0, t_final, n_points)
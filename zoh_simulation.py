@@ -0,0 +1,196 @@
+import numpy as np
+from scipy.linalg import expm
+from scipy.signal import lfilter
+
+# Exact discrete-time simulation of the forced mass-spring-damper
+#     m x'' + c x' + k x = f(t)
+# for forcing that is held constant over each sample (zero order hold). The state
+# transition matrix Phi = e^(A dt) and input matrix Gamma = int_0^dt e^(A s) ds B are
+# computed once per plant, after which the recurrence
+#     s[n+1] = Phi s[n] + Gamma f[n]
+# is exact. The recurrence is run as a 2nd order IIR filter through scipy's lfilter,
+# so no Python code runs per sample (unlike odeint calling diffs).
+
+
+def zoh_discretize(m, c, k, dt: float):
+    """
+    Zero order hold discretization of one or many plants.
+
+    Args:
+        m, c, k (float or array-like): Mass, damping coefficient and spring constant,
+            broadcast against each other to P plants.
+        dt (float): Sample time.
+
+    Returns:
+        tuple: (Phi, Gamma) with shapes (P, 2, 2) and (P, 2), state = [x, x'].
+    """
+    m, c, k = (np.atleast_1d(a).astype(float) for a in np.broadcast_arrays(m, c, k))
+    n = m.size
+    # Augmented matrix [[A, B], [0, 0]] so one expm gives both Phi and Gamma
+    aug = np.zeros((n, 3, 3))
+    aug[:, 0, 1] = 1
+    aug[:, 1, 0] = -k.ravel()/m.ravel()
+    aug[:, 1, 1] = -c.ravel()/m.ravel()
+    aug[:, 1, 2] = 1/m.ravel()
+    E = expm(aug*dt)
+    return E[:, :2, :2], E[:, :2, 2]
+
+
+def _filter_coefficients(Phi: np.ndarray, Gamma: np.ndarray, row: int):
+    """lfilter (b, a) of the sampled state component `row` for one plant."""
+    a = np.array([1.0, -np.trace(Phi), np.linalg.det(Phi)])
+    # Row of adj(zI - Phi) times Gamma gives the z^-1 and z^-2 numerator terms
+    if row == 0:
+        b = np.array([0.0, Gamma[0], Phi[0, 1]*Gamma[1] - Phi[1, 1]*Gamma[0]])
+    else:
+        b = np.array([0.0, Gamma[1], Phi[1, 0]*Gamma[0] - Phi[0, 0]*Gamma[1]])
+    return b, a
+
+
+def simulate_zoh(m, c, k, force, dt: float, x0=0.0, v0=0.0):
+    """
+    Simulate forced response(s) exactly for piecewise-constant forcing.
+
+    Args:
+        m, c, k (float or array-like): Plant parameters, P plants after broadcasting.
+        force (array-like): Force samples, shape (T,) shared by all plants or (P, T).
+            force[n] is held over [n dt, (n+1) dt).
+        dt (float): Sample time.
+        x0, v0 (float or array-like): Initial displacement and velocity per plant.
+
+    Returns:
+        tuple: (x, v) displacement and velocity at t = n dt, shape (T,) for a
+            single plant or (P, T).
+    """
+    force = np.asarray(force, dtype=float)
+    single = np.ndim(m) == np.ndim(c) == np.ndim(k) == 0 and force.ndim == 1
+    Phi, Gamma = zoh_discretize(m, c, k, dt)
+    n_plants = Phi.shape[0]
+    force = np.broadcast_to(force, (n_plants, force.shape[-1])) if force.ndim == 1 else force
+    if force.shape[0] != n_plants:
+        n_plants = force.shape[0]
+        Phi = np.broadcast_to(Phi, (n_plants, 2, 2))
+        Gamma = np.broadcast_to(Gamma, (n_plants, 2))
+    s0 = np.stack(np.broadcast_arrays(np.broadcast_to(x0, (n_plants,)), np.broadcast_to(v0, (n_plants,))),
+                  axis=1).astype(float)
+
+    x = np.empty(force.shape)
+    v = np.empty(force.shape)
+    for p in range(n_plants):
+        s1 = Phi[p] @ s0[p]
+        for row, out in ((0, x), (1, v)):
+            b, a = _filter_coefficients(Phi[p], Gamma[p], row)
+            # Filter state that reproduces the free response from s0 (b[0] = 0 so y[0] = zi[0])
+            zi = np.array([s0[p, row], s1[row] + a[1]*s0[p, row]])
+            out[p], _ = lfilter(b, a, force[p], zi=zi)
+    if single:
+        return x[0], v[0]
+    return x, v
+
+
+class ZOHStream:
+    """
+    Stateful ZOH simulator for force samples that arrive in chunks.
+
+    Every call to update() consumes the next force samples and returns the matching
+    displacements, carrying the filter state over so the concatenated output equals
+    simulate_zoh on the whole record. The work per sample is fixed and the only state
+    kept between calls is two filter values per plant. Pass a preallocated `out` to
+    update() (or to run(), which then yields views of it) to keep the displacements
+    in one buffer instead of a new array per chunk.
+
+    Example:
+        stream = ZOHStream(61.48, 535.8, 40_000, dt=1e-4)
+        for x_chunk in stream.run(load_cell_chunks):
+            ...
+    """
+
+    def __init__(self, m, c, k, dt: float, x0=0.0, v0=0.0):
+        self.single = np.ndim(m) == np.ndim(c) == np.ndim(k) == 0
+        self.Phi, self.Gamma = zoh_discretize(m, c, k, dt)
+        self.n_plants = self.Phi.shape[0]
+        self._coeffs = [_filter_coefficients(self.Phi[p], self.Gamma[p], 0) for p in range(self.n_plants)]
+        self._zi = np.zeros((self.n_plants, 2))
+        self.samples = 0
+        self.reset(x0, v0)
+
+    def reset(self, x0=0.0, v0=0.0):
+        """Restart from the given initial displacement and velocity."""
+        s0 = np.stack([np.broadcast_to(np.asarray(x0, dtype=float), (self.n_plants,)),
+                       np.broadcast_to(np.asarray(v0, dtype=float), (self.n_plants,))], axis=1)
+        for p, (b, a) in enumerate(self._coeffs):
+            s1 = self.Phi[p] @ s0[p]
+            self._zi[p] = (s0[p, 0], s1[0] + a[1]*s0[p, 0])
+        self.samples = 0
+
+    def update(self, force_chunk, out: np.ndarray = None) -> np.ndarray:
+        """
+        Advance by len(force_chunk) samples.
+
+        Args:
+            force_chunk (array-like): Force samples, (n,) shared by all plants or (P, n).
+            out (np.ndarray): Optional float64 buffer of at least (P, n) samples ((n,) for
+                one plant). The displacements are written to its first n columns.
+                lfilter has no output argument, so it still makes one temporary of n
+                samples per plant.
+
+        Returns:
+            np.ndarray: Displacement at the same sample instants, (n,) for one plant or
+                (P, n), a view of `out` when given.
+        """
+        force_chunk = np.asarray(force_chunk, dtype=float)
+        n = force_chunk.shape[-1]
+        force_chunk = np.broadcast_to(force_chunk, (self.n_plants, n))
+        if out is None:
+            out = np.empty((self.n_plants, n))
+        else:
+            out = (out[None, :] if out.ndim == 1 else out)[:, :n]
+            if out.shape != (self.n_plants, n):
+                raise ValueError(f"out must hold at least ({self.n_plants}, {n}) samples, got {out.shape}")
+        for p, (b, a) in enumerate(self._coeffs):
+            out[p], self._zi[p] = lfilter(b, a, force_chunk[p], zi=self._zi[p])
+        self.samples += n
+        return out[0] if self.single else out
+
+    def run(self, chunks, out: np.ndarray = None):
+        """
+        Generator pipeline stage: yields one displacement chunk per force chunk.
+
+        With `out`, every chunk is written into that buffer (see update()), so copy a
+        yielded chunk to keep it past the next one.
+        """
+        for chunk in chunks:
+            yield self.update(chunk, out)
+
+
+if __name__ == "__main__":
+    import time
+    from scipy.integrate import odeint
+
+    # Plant from vibrations_functions.py driven by a measured-looking load record:
+    # 1000 N mean with a 5 Hz component and noise, sampled at 10 kHz
+    m, c, k = 61.48, 535.8, 40_000
+    n_samples = 1_000_000
+    dt = 1e-4
+    time_vec = np.arange(n_samples)*dt
+    rng = np.random.default_rng(0)
+    force = 1000 + 200*np.sin(2*np.pi*5*time_vec) + 50*rng.standard_normal(n_samples)
+
+    def diffs(x, t):
+        f = force[min(int(t/dt), n_samples - 1)]
+        return [x[1], (f - c*x[1] - k*x[0]) / m]
+
+    # odeint has to step through every force discontinuity, which takes minutes for
+    # the full record, so it is timed on the first tenth and scaled linearly
+    n_ref = n_samples // 10
+    start = time.perf_counter()
+    reference = odeint(diffs, [0, 0], time_vec[:n_ref], hmax=dt)
+    t_odeint = (time.perf_counter() - start) * n_samples / n_ref
+
+    start = time.perf_counter()
+    x, v = simulate_zoh(m, c, k, force, dt)
+    t_zoh = time.perf_counter() - start
+
+    print(f"odeint: ~{t_odeint:.1f} s, zoh: {t_zoh:.3f} s, speedup ~{t_odeint / t_zoh:.0f}x on {n_samples} samples")
+    print(f"max |x_zoh - x_odeint| = {np.max(np.abs(x[:n_ref] - reference[:, 0])):.2e} m "
+          f"(peak |x| = {np.max(np.abs(x)):.2e} m)")